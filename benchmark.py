@@ -0,0 +1,244 @@
+# Benchmarks of every stage of the RE -> ε-NFA -> DFA pipeline on generated
+# families of patterns of growing size, run as
+#
+#     python benchmark.py [--quick] [--output FILE] [--baseline FILE]
+#
+# For every pattern it reports the best time of a few runs and the peak
+# memory (tracemalloc, measured in a separate run) of each stage, and how
+# fast the time of each stage grows with the size of the pattern. The
+# results are saved as JSON and compared with a baseline file from an
+# earlier run, benchmarks/baseline.json by default: stages that got slower
+# than threshold times their baseline are reported as regressions and the
+# exit status is 1. The baseline is refreshed with
+#
+#     python benchmark.py --output benchmarks/baseline.json
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from re_nfa_dfa.NFA_to_DFA_main import DFA, NFA
+from re_nfa_dfa.Re_to_NFA_main import (arrange_nfa, compute_regex,
+                                       make_exp_tree, nfa_to_dict,
+                                       output_nfa_to_json, polish_regex)
+
+# Symbols of the generated patterns, every printable character but the
+# operators and the characters of escapes, classes and repetitions
+SYMBOLS = [chr(c) for c in range(0x21, 0x7f) if chr(c) not in "()*+.?[\\]{|}"]
+
+# Times below this many seconds are too noisy to be called a regression
+MIN_SECONDS = 0.001
+
+
+def concatenation(n):
+    # a long concatenation of n symbols, matched by itself
+    text = "".join(SYMBOLS[i % len(SYMBOLS)] for i in range(n))
+    return text, text
+
+
+def alternation(n):
+    # a union of n different symbols, under a star so it matches long texts
+    symbols = [chr(0x100 + i) for i in range(n)]
+    text = "".join(random.Random(n).choice(symbols) for i in range(1000))
+    return "(" + "+".join(symbols) + ")*", text
+
+
+def nested_stars(n):
+    # n stars nested in each other around one symbol
+    return "(" * n + "a" + ")*" * n, "a" * 1000
+
+
+def star_union(n):
+    # a union of n six letter words under a star, whose epsilon free NFA
+    # would give every word end the moves of every word start
+    rng = random.Random(n)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for j in range(6))
+             for i in range(n)]
+    text = "".join(rng.choice(words) for i in range(200))
+    return "(" + "+".join(words) + ")*", text
+
+
+def blowup(n):
+    # (a+b)*a(a+b)^n, whose minimal DFA has 2^(n + 1) states
+    rng = random.Random(n)
+    text = "".join(rng.choice("ab") for i in range(1000)) + "a" + "b" * n
+    return "(a+b)*a" + "(a+b)" * n, text
+
+
+# Pattern families with their sizes, and the smaller sizes used by --quick
+FAMILIES = {
+    "concatenation": (concatenation, [100, 1000, 10000], [100, 1000]),
+    "alternation": (alternation, [10, 100, 1000], [10, 100]),
+    "nested_stars": (nested_stars, [10, 100, 1000], [10, 100]),
+    "star_union": (star_union, [10, 100, 1000], [10, 100]),
+    "blowup": (blowup, [4, 8, 12], [4, 8]),
+}
+
+
+def stages(work, directory):
+    # returns the stages of the pipeline as (name, function, key) triples,
+    # each function reads the results of the stages before it from work
+    # and its own result is stored in work[key]
+    path = os.path.join(directory, "output.json")
+
+    def read_json():
+        with open(path, 'r') as file:
+            return NFA.fromDict(json.load(file))
+
+    def remove_epsilon():
+        return NFA.fromDict(nfa_to_dict(work['arranged'])).removeEpsilon()
+
+    def subset_construction():
+        dfa_states, dfa_transitions = work['nfa'].subsetConstruction()
+        return DFA.fromSubsets(work['nfa'], dfa_states, dfa_transitions)
+
+    return [
+        ("polish_regex", lambda: polish_regex(work['regex']), 'postfix'),
+        ("make_exp_tree", lambda: make_exp_tree(work['postfix']), 'tree'),
+        ("compute_regex", lambda: compute_regex(work['tree']), 'fa'),
+        ("arrange_nfa", lambda: arrange_nfa(work['fa']), 'arranged'),
+        ("remove_epsilon", remove_epsilon, 'reduced'),
+        ("json_write", lambda: output_nfa_to_json(work['reduced'], path), None),
+        ("json_read", read_json, 'nfa'),
+        ("epsilon_closure", lambda: work['nfa'].getClosureMasks(), None),
+        ("subset_construction", subset_construction, 'dfa'),
+        ("minimize", lambda: work['dfa'].minimize()[0], 'minimal'),
+        ("match", lambda: work['minimal'].match(work['text']), None),
+    ]
+
+
+def measure(function, repeat):
+    # returns the result, best time of repeat runs and peak memory of function
+    best = math.inf
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(families, repeat):
+    # returns the list of results of every stage for every pattern
+    results = list()
+    with tempfile.TemporaryDirectory() as directory:
+        for family, sizes in families:
+            for size in sizes:
+                regex, text = FAMILIES[family][0](size)
+                work = {'regex': regex, 'text': text}
+                for stage, function, key in stages(work, directory):
+                    result, seconds, peak = measure(function, repeat)
+                    if key is not None:
+                        work[key] = result
+                    results.append({
+                        "family": family,
+                        "size": size,
+                        "stage": stage,
+                        "seconds": seconds,
+                        "peak_bytes": peak,
+                    })
+                print("{:<14} {:>6}: {} NFA states ({} with epsilon), "
+                      "{} DFA states, {} minimal".format(
+                          family, size, work['nfa'].no_state,
+                          len(work['arranged']['states']),
+                          work['dfa'].no_state, work['minimal'].no_state),
+                      file=sys.stderr)
+    return results
+
+
+def report(results, file):
+    # writes the time and peak memory of every stage, and the growth of
+    # the time with the size as the exponent k of time ~ size^k
+    file.write("{:<14} {:>6} {:<20} {:>12} {:>12} {:>6}\n".format(
+        "family", "size", "stage", "time (ms)", "peak (KiB)", "k"))
+    previous = dict()
+    for result in results:
+        key = (result["family"], result["stage"])
+        growth = ""
+        if key in previous:
+            size, seconds = previous[key]
+            if seconds > 0 and result["seconds"] > 0:
+                growth = "{:.2f}".format(
+                    math.log(result["seconds"] / seconds) /
+                    math.log(result["size"] / size))
+        previous[key] = (result["size"], result["seconds"])
+        file.write("{:<14} {:>6} {:<20} {:>12.3f} {:>12.1f} {:>6}\n".format(
+            result["family"], result["size"], result["stage"],
+            result["seconds"] * 1000, result["peak_bytes"] / 1024, growth))
+
+
+# Baseline committed with the code, compared with when --baseline is not given
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "benchmarks", "baseline.json")
+
+
+def regressions(results, baseline, threshold):
+    # returns the results more than threshold times slower than the same
+    # family, size and stage of the baseline, with the baseline time
+    before = {(r["family"], r["size"], r["stage"]): r["seconds"]
+              for r in baseline["results"]}
+    slower = list()
+    for result in results:
+        seconds = before.get((result["family"], result["size"],
+                              result["stage"]))
+        if seconds is None or result["seconds"] < MIN_SECONDS:
+            continue
+        if result["seconds"] > seconds * threshold:
+            slower.append((result, seconds))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every stage of the RE -> NFA -> DFA pipeline.")
+    parser.add_argument('--quick', action='store_true',
+                        help="only run the smaller sizes")
+    parser.add_argument('--family', action='append', choices=list(FAMILIES),
+                        help="only run this family, can be repeated")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs of each stage, the best time is kept")
+    parser.add_argument('--output', default="benchmark_results.json",
+                        help="file the results are saved to")
+    parser.add_argument('--baseline', default=BASELINE,
+                        help="results of an earlier run to compare with "
+                             "(default: benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="slowdown over the baseline reported as a "
+                             "regression")
+    args = parser.parse_args(argv)
+
+    families = [(family, FAMILIES[family][2 if args.quick else 1])
+                for family in args.family or FAMILIES]
+    results = run(families, args.repeat)
+    report(results, sys.stdout)
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, file, indent=2)
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    slower = regressions(results, baseline, args.threshold)
+    for result, seconds in slower:
+        print("REGRESSION {} {} {}: {:.3f} ms, was {:.3f} ms".format(
+            result["family"], result["size"], result["stage"],
+            result["seconds"] * 1000, seconds * 1000))
+    return 1 if len(slower) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1840 @@
+import bisect
+import collections
+import itertools
+import mmap
+import struct
+import sys
+from array import array
+
+from . import instrumentation
+
+def prepareForDrawing(states, end_state, prev_start):
+    # make the last state as out state
+    states["S" + str(end_state)]["terminalState"] = True
+    # sort the state ascending
+    states = collections.OrderedDict(sorted(states.items()))
+    # loop over sorted states and save them as the given example to json file
+    # return the json file content to be displayed in graph format
+    states.update({"startingState": ("S" + str(prev_start))})
+    import json
+    with open('out/nfa.json', 'w') as fp:
+        json.dump(states, fp, ensure_ascii=True)
+    print(states)
+    return states
+
+def construct_node(state, nfa, starting_state, graph):
+    # construct a graph node using given state
+    # check whether state is terminal to draw double circle
+    if nfa[state]['terminalState']:
+        graph.node(state, label=state, shape='doublecircle')
+    else:
+        graph.node(state, label=state, shape='circle')
+    # check whether state is starting to draw input arrow
+    if state == starting_state:
+        graph.edge('start', state)
+
+def visualize(nfa):
+    # visualize output NFA into a directed graph
+    # graphviz is only needed for drawing, so it is imported here
+    import graphviz
+    # initialize directed graph
+    graph = graphviz.Digraph(comment='NFA Visualization')
+    # set graph flow from left to right
+    graph.graph_attr['rankdir'] = 'LR'
+    # set entry point
+    graph.node('start', label='start', shape='plaintext')
+    # get the starting state of NFA
+    starting_state = nfa['startingState']
+    del nfa['startingState']
+    # initialize nodes list
+    nodes = list()
+    # loop over each NFA state
+    for state in nfa:
+        # check whether state is created or not
+        if not state in nodes:
+            # add state to created nodes
+            nodes.append(state)
+            # construct a graph node for the state
+            construct_node(state, nfa, starting_state, graph)
+        # loop over each successor state
+        for successor in nfa[state]:
+            # skip 'terminalstate' key
+            if successor != 'terminalState':
+                # check whether successor state is created or not
+                if nfa[state][successor] in nodes:
+                    # create an edge between two states
+                    graph.edge(state, nfa[state][successor], label=successor)
+                else:
+                    # add state to created nodes
+                    nodes.append(nfa[state][successor])
+                    # construct a graph node for the state
+                    construct_node(nfa[state][successor], nfa, starting_state, graph)
+                    # create an edge between two states
+                    graph.edge(state, nfa[state][successor], label=successor)
+    # set output format to SVG
+    graph.format = 'svg'
+    # render final graph
+    graph.render('out/nfa-graph', view=False)
+
+# Largest number of states drawn in a diagram, bigger automata are refused
+# or, when sampling, cut down to the states closest to the start state
+MAX_DRAW_STATES = 500
+
+
+def sampleStates(no_state, start, successors, max_states, sample):
+    # returns the states to draw in breadth first order from start,
+    # successors(state) gives the states a state has edges to
+    # raises ValueError for more than max_states states unless sample is set
+    if no_state > max_states and not sample:
+        raise ValueError("automaton has " + str(no_state) + " states, more than "
+                         + str(max_states) + " can be drawn, use sample=True "
+                         "to draw only part of it")
+    order = [start]
+    seen = {start}
+    cur = 0
+    while (cur < len(order) and len(order) < max_states):
+        for x in successors(order[cur]):
+            if x not in seen and len(order) < max_states:
+                seen.add(x)
+                order.append(x)
+        cur += 1
+    return order
+
+
+def newDigraph():
+    # graphviz is imported only when something is drawn, so building
+    # and matching automata works without it
+    import graphviz
+    return graphviz.Digraph()
+
+
+def symbolRanges(symbol):
+    # returns the (first, last) code point ranges of an alphabet symbol,
+    # which is a character or a class of characters written as [...] with
+    # ranges like a-z, and a backslash before any of \ ] - ^ [ in it
+    if len(symbol) < 2 or symbol[0] != '[' or symbol[-1] != ']':
+        return [(ord(c), ord(c)) for c in symbol]
+    ranges = list()
+    end = len(symbol) - 1
+    i = 1
+    while (i < end):
+        if symbol[i] == '\\':
+            i += 1
+        first = last = symbol[i]
+        i += 1
+        if i + 1 < end and symbol[i] == '-':
+            if symbol[i + 1] == '\\':
+                i += 1
+            last = symbol[i + 1]
+            i += 2
+        ranges.append((ord(first), ord(last)))
+    return ranges
+
+
+# Largest number of characters that symbolClasses lists one by one, larger
+# alphabets are kept as ranges in a RangeClasses
+MAX_LISTED_CHARS = 4096
+
+# Code points below this are always listed, so matching ASCII and Latin-1
+# text never bisects
+DENSE_CHARS = 256
+
+
+class RangeClasses(dict):
+    # Map of characters to symbol indexes like the dict of symbolClasses,
+    # that lists only the code points below DENSE_CHARS, by character and
+    # by code point, and finds the others by bisecting sorted ranges
+    def __init__(self, ranges):
+        dict.__init__(self)
+        self.starts = array('i')
+        self.ends = array('i')
+        self.indexes = array('i')
+        for first, last, i in ranges:
+            for x in range(first, min(last + 1, DENSE_CHARS)):
+                self[chr(x)] = i
+                self[x] = i
+            if last >= DENSE_CHARS:
+                self.starts.append(max(first, DENSE_CHARS))
+                self.ends.append(last)
+                self.indexes.append(i)
+
+    def get(self, c, default=None):
+        i = dict.get(self, c)
+        if i is not None:
+            return i
+        x = ord(c) if isinstance(c, str) else c
+        k = bisect.bisect_right(self.starts, x) - 1
+        if k >= 0 and x <= self.ends[k]:
+            return self.indexes[k]
+        return default
+
+
+def symbolClasses(symbols):
+    # returns the map of every character of the symbols to the index of its
+    # symbol, keyed by both the character and its code point; a character
+    # in more than one symbol belongs to the last one
+    # symbols with more than MAX_LISTED_CHARS characters in all are given
+    # as a RangeClasses, so large classes cost memory by range and not by
+    # character
+    pieces = [(first, last, i) for i in range(len(symbols))
+              for first, last in symbolRanges(symbols[i])]
+    if sum(last - first + 1 for first, last, i in pieces) <= MAX_LISTED_CHARS:
+        classes = dict()
+        for first, last, i in pieces:
+            for x in range(first, last + 1):
+                classes[chr(x)] = i
+                classes[x] = i
+        return classes
+
+    # the ends of the ranges cut the code points into intervals, each
+    # interval belongs to the last symbol covering it
+    points = sorted(set(x for first, last, i in pieces
+                        for x in (first, last + 1)))
+    owners = [None] * len(points)
+    for first, last, i in reversed(pieces):
+        k = bisect.bisect_left(points, first)
+        while points[k] <= last:
+            if owners[k] is None:
+                owners[k] = i
+            k += 1
+    ranges = []
+    for k in range(len(points) - 1):
+        if owners[k] is None:
+            continue
+        if len(ranges) > 0 and ranges[-1][1] == points[k] - 1 and \
+                ranges[-1][2] == owners[k]:
+            ranges[-1] = (ranges[-1][0], points[k + 1] - 1, owners[k])
+        else:
+            ranges.append((points[k], points[k + 1] - 1, owners[k]))
+    return RangeClasses(ranges)
+
+
+class Transitions:
+    # Transitions of the NFA on one alphabet stored in CSR form,
+    # the To States of state i are targets[offsets[i]:offsets[i + 1]]
+    __slots__ = ('offsets', 'targets')
+
+    def __init__(self, no_state, pairs):
+        # Counting the To States of every From State
+        counts = array('i', [0]) * (no_state + 1)
+        for x, y in pairs:
+            counts[x + 1] += 1
+        self.offsets = array('i', itertools.accumulate(counts))
+
+        # Placing every To State in the slot of its From State
+        self.targets = array('i', [0]) * len(pairs)
+        fill = self.offsets[:-1]
+        for x, y in pairs:
+            self.targets[fill[x]] = y
+            fill[x] += 1
+
+    def __getitem__(self, state):
+        return self.targets[self.offsets[state]:self.offsets[state + 1]]
+
+    def __repr__(self):
+        return str({i: list(self[i]) for i in range(len(self.offsets) - 1)
+                    if self.offsets[i] != self.offsets[i + 1]})
+
+
+class NFA:
+    def __init__(self, no_state, states, no_alphabet, alphabets, start,
+                 no_final, finals, no_transition, transitions, final_tags=None,
+                 epsilon='e'):
+        # The lists are copied, so the caller's lists (like the ones of a
+        # dictionary given to fromDict) are never changed
+        self.no_state = no_state
+        self.states = list(states)
+        self.alphabets = list(alphabets)
+
+        # Adding epsilon alphabet as the last one in the list, the alphabet
+        # count is that of the list and includes it
+        # Files written by Re_to_NFA_main use '' for epsilon, so 'e' can
+        # be a symbol, older ones use 'e'
+        self.epsilon = epsilon
+        if epsilon in self.alphabets:
+            self.alphabets.remove(epsilon)
+        self.alphabets.append(epsilon)
+        self.no_alphabet = len(self.alphabets)
+        self.start = start
+        self.no_final = no_final
+        self.finals = list(finals)
+        self.no_transition = no_transition
+        self.transitions = list(transitions)
+
+        # Dictionaries to get index of states or alphabets
+        self.states_dict = dict()
+        for i in range(self.no_state):
+            self.states_dict[self.states[i]] = i
+        self.alphabets_dict = dict()
+        for i in range(self.no_alphabet):
+            self.alphabets_dict[self.alphabets[i]] = i
+
+        # transition table is of the form
+        # [Alphabet][From State] -> [To States]
+        pairs = [list() for j in range(self.no_alphabet)]
+        for i in range(self.no_transition):
+            pairs[self.alphabets_dict[self.transitions[i][1]]].append(
+                (self.states_dict[self.transitions[i][0]],
+                 self.states_dict[self.transitions[i][2]]))
+        self.transition_table = [Transitions(self.no_state, pairs[j])
+                                 for j in range(self.no_alphabet)]
+
+        # Bitset of the final states, bit i is set if state i is final
+        self.finals_mask = 0
+        for x in self.finals:
+            self.finals_mask |= 1 << self.states_dict[x]
+
+        # For an NFA compiled from a set of regexes, the indexes of the
+        # regexes of each final state, [Final State] -> [Regex indexes]
+        # A final state accepting for several regexes is listed once in
+        # finals for each of them
+        self.final_tags = None
+        if final_tags is not None:
+            self.final_tags = dict()
+            for i in range(self.no_final):
+                self.final_tags.setdefault(
+                    self.states_dict[self.finals[i]], list()).append(final_tags[i])
+
+        # Literal every match starts with and literals every match contains,
+        # set by compile from the regex and used by search to skip input
+        self.prefix = ''
+        self.required = []
+
+        # Epsilon closure of every state as a bitset and the bitset of
+        # states reached on each alphabet, filled in by getClosureMasks
+        self.epsilon_closure = None
+        self.step_masks = None
+        self.move_masks = None
+
+    # Method to get input from User
+    @classmethod
+    def fromUser(cls):
+        import json
+        with open("output.json", 'r') as file:
+            nfa_json = json.load(file)
+        return cls.fromDict(nfa_json)
+
+    # Method to get input from a dictionary in the output.json format
+    @classmethod
+    def fromDict(cls, nfa_json):
+        no_state = nfa_json["no_state"]
+        states = nfa_json["states"]
+        no_alphabet = nfa_json["no_alphabet"]
+        alphabets = nfa_json["alphabets"]
+        start = nfa_json["start"]
+        no_final = nfa_json["no_final"]
+        finals = nfa_json["finals"]
+        no_transition = nfa_json["no_transition"]
+        transitions = nfa_json["transitions"]
+        final_tags = nfa_json.get("final_tags")
+        epsilon = nfa_json.get("epsilon", 'e')
+        return cls(no_state, states, no_alphabet, alphabets, start,
+                   no_final, finals, no_transition, transitions, final_tags,
+                   epsilon)
+
+    # Method to get the NFA as a dictionary in the output.json format, its
+    # lists are copies of the ones of the NFA
+    def toDict(self):
+        nfa_json = {
+            "no_state": self.no_state,
+            "states": list(self.states),
+            "no_alphabet": self.no_alphabet - 1,
+            "alphabets": self.alphabets[:-1],
+            "start": self.start,
+            "no_final": self.no_final,
+            "finals": list(self.finals),
+            "no_transition": self.no_transition,
+            "transitions": [list(x) for x in self.transitions],
+            "epsilon": self.epsilon
+        }
+        if self.final_tags is not None:
+            finals = list()
+            final_tags = list()
+            for x, tags in self.final_tags.items():
+                for tag in tags:
+                    finals.append(self.states[x])
+                    final_tags.append(tag)
+            nfa_json["finals"] = finals
+            nfa_json["final_tags"] = final_tags
+        return nfa_json
+
+    # Method to represent quintuple
+    def __repr__(self):
+        return "Q : " + str(self.states) + "\nΣ : " + str(self.alphabets) + "\nq0 : " + str(self.start) + "\nF : " + str(
+            self.finals) + "\nδ : \n" + str(self.transition_table)
+
+    def getEpsilonClosure(self, state):
+
+        # Method to get Epsilon Closure of a state of NFA
+        # Make a dictionary to track if the state has been visited before
+        # And a array that will act as a stack to get the state to visit next
+        closure = dict()
+        closure[self.states_dict[state]] = 0
+        closure_stack = [self.states_dict[state]]
+        epsilon = self.transition_table[self.alphabets_dict[self.epsilon]]
+
+        # While stack is not empty the loop will run
+        while (len(closure_stack) > 0):
+
+            # Get the top of stack that will be evaluated now
+            cur = closure_stack.pop()
+
+            # For the epsilon transition of that state,
+            # if not present in closure array then add to dict and push to stack
+            for x in epsilon[cur]:
+                if x not in closure:
+                    closure[x] = 0
+                    closure_stack.append(x)
+            closure[cur] = 1
+        if instrumentation.active is not None:
+            instrumentation.count("epsilon_closures")
+            instrumentation.count("epsilon_closure_states", len(closure))
+        return closure.keys()
+
+    def getClosureMasks(self, steps=True):
+
+        # Method to get Epsilon Closure of every state of NFA as bitsets
+        # States on an epsilon cycle share their closure, so the closures
+        # are computed once per strongly connected component (Tarjan),
+        # components are finished after every component they lead to
+        # With steps False, the masks used by getImage are not computed
+        started = instrumentation.start()
+        epsilon = self.transition_table[self.no_alphabet - 1]
+        index = [-1] * self.no_state
+        low = [0] * self.no_state
+        on_stack = bytearray(self.no_state)
+        stack = list()
+        masks = [0] * self.no_state
+        counter = 0
+
+        for root in range(self.no_state):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, 0)]
+
+            while (len(work) > 0):
+                cur, i = work[-1]
+                successors = epsilon[cur]
+
+                # Visit the next epsilon successor of the current state
+                if i < len(successors):
+                    work[-1] = (cur, i + 1)
+                    x = successors[i]
+                    if index[x] == -1:
+                        index[x] = low[x] = counter
+                        counter += 1
+                        stack.append(x)
+                        on_stack[x] = 1
+                        work.append((x, 0))
+                    elif on_stack[x]:
+                        low[cur] = min(low[cur], index[x])
+                    continue
+
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[cur])
+
+                # The current state is the root of a component,
+                # its closure is the component and the closures it leads to
+                if low[cur] == index[cur]:
+                    component = list()
+                    mask = 0
+                    while True:
+                        x = stack.pop()
+                        on_stack[x] = 0
+                        component.append(x)
+                        mask |= 1 << x
+                        if x == cur:
+                            break
+                    for x in component:
+                        for y in epsilon[x]:
+                            mask |= masks[y]
+                    for x in component:
+                        masks[x] = mask
+
+        self.epsilon_closure = masks
+
+        # For each alphabet, the bitset of states reached from a state
+        # (closure included) and the bitset of states that have a move,
+        # filled in from the transitions so states without a move on an
+        # alphabet cost nothing
+        if steps:
+            no_symbol = self.no_alphabet - 1
+            self.step_masks = [[0] * self.no_state for al in range(no_symbol)]
+            moving = [bytearray(self.no_state // 8 + 1)
+                      for al in range(no_symbol)]
+            for from_state, al, to_state in self.transitions:
+                al = self.alphabets_dict[al]
+                if al == no_symbol:
+                    continue
+                x = self.states_dict[from_state]
+                self.step_masks[al][x] |= masks[self.states_dict[to_state]]
+                moving[al][x >> 3] |= 1 << (x & 7)
+            self.move_masks = [int.from_bytes(move, 'little')
+                               for move in moving]
+
+        if started is not None:
+            sizes = [bin(mask).count('1') for mask in masks]
+            instrumentation.maximum("epsilon_closure_states", max(sizes, default=0))
+            instrumentation.finish("epsilon_closure", started,
+                                   epsilon_closures=self.no_state,
+                                   epsilon_closure_states=sum(sizes))
+        return masks
+
+    def getImage(self, state_mask, al):
+
+        # Method to get the bitset of states reached from a bitset of states
+        # on an alphabet, by OR-ing the precomputed masks of its states
+        if self.step_masks is None:
+            self.getClosureMasks()
+        step = self.step_masks[al]
+        to_mask = 0
+        for x in self.getStateList(state_mask & self.move_masks[al]):
+            to_mask |= step[x]
+        return to_mask
+
+    def getStateMask(self, state_list):
+        # Method to get the bitset of a list of states
+        mask = 0
+        for x in state_list:
+            mask |= 1 << x
+        return mask
+
+    def getStateList(self, state_mask):
+        # Method to get the sorted list of states in a bitset, read from its
+        # binary digits in one pass, lowest bit first, since clearing the
+        # bits one at a time would copy the whole bitset for every bit
+        bits = bin(state_mask)[:1:-1]
+        state_list = list()
+        x = bits.find('1')
+        while (x != -1):
+            state_list.append(x)
+            x = bits.find('1', x + 1)
+        return state_list
+
+    def getStateName(self, state_list):
+        if -1 in state_list:
+            return 'ϕ'
+        else:
+            # Get name from set of states to display in the final DFA diagram
+            name = ''
+            for x in state_list:
+                name += self.states[x]
+            return name
+
+    def isFinalDFA(self, state_list):
+
+        # Method to check if the set of state is final state in DFA
+        # by checking if any of the set is a final state in NFA
+        for x in state_list:
+            if (self.finals_mask >> x) & 1:
+                return True
+        return False
+
+    def subsetConstruction(self):
+
+        # Method to convert the NFA to DFA states using subset construction
+        # Returns the DFA states as a list of NFA state lists and a list of
+        # (from state, alphabet index, to state) triples, where the states
+        # are indexes in that list and -1 is the dead state ϕ
+        # Nothing is drawn here, see DFA.draw for the diagram
+
+        # Finding epsilon closure beforehand so to not recalculate each time,
+        # unless it was already found
+        if self.step_masks is None:
+            self.getClosureMasks()
+        closure = self.epsilon_closure
+        started = instrumentation.start()
+
+        # First state of DFA will be epsilon closure of start state of NFA
+        # DFA states are bitsets of NFA states, interned in a dictionary
+        # to get their index, which also acts as the visited check
+        start_mask = closure[self.states_dict[self.start]]
+        dfa_ids = {start_mask: 0}
+        dfa_masks = [start_mask]
+        dfa_states = [self.getStateList(start_mask)]
+
+        # List to store the transitions of DFA for building the matcher
+        dfa_transitions = list()
+
+        # The alphabets every NFA state has a move on, so the image of a DFA
+        # state on every alphabet is found in one walk over its NFA states
+        moving = [list() for x in range(self.no_state)]
+        for al in range(self.no_alphabet - 1):
+            for x in self.getStateList(self.move_masks[al]):
+                moving[x].append(al)
+
+        # The list of DFA states acts as the queue of states to evaluate,
+        # the loop will run till every discovered state is evaluated
+        cur = 0
+        while (cur < len(dfa_masks)):
+            images = dict()
+            for x in dfa_states[cur]:
+                for al in moving[x]:
+                    images[al] = images.get(al, 0) | self.step_masks[al][x]
+
+            # Traversing through all the alphabets for evaluating transitions in DFA
+            for al in range((self.no_alphabet) - 1):
+                to_mask = images.get(al, 0)
+
+                # Check if epsilon closure of the new set is not empty
+                if to_mask:
+                    # Check if the to state already exists in DFA and if not then add it
+                    to = dfa_ids.get(to_mask)
+                    if to is None:
+                        to = len(dfa_masks)
+                        dfa_ids[to_mask] = to
+                        dfa_masks.append(to_mask)
+                        dfa_states.append(self.getStateList(to_mask))
+                    dfa_transitions.append((cur, al, to))
+
+                # Else case for empty epsilon closure
+                # This is a transition to the dead state(ϕ) in DFA
+                else:
+                    dfa_transitions.append((cur, al, -1))
+            cur += 1
+
+        if started is not None:
+            instrumentation.finish(
+                "subset_construction", started, dfa_states=len(dfa_states),
+                dfa_transitions=len(dfa_transitions),
+                dead_state_transitions=sum(
+                    1 for x in dfa_transitions if x[2] == -1))
+        return dfa_states, dfa_transitions
+
+    def removeEpsilon(self, max_growth=2):
+
+        # Method to get an equivalent NFA without epsilon transitions
+        # Only the start state and the states entered on an alphabet are
+        # kept, so chains of epsilon transitions between them disappear.
+        # A kept state moves on an alphabet to wherever any state of its
+        # epsilon closure moves, and is final if its closure has a final
+        # state. States that cannot be reached from the start or cannot
+        # reach a final state are pruned, the others are renamed q1, q2, ...
+        # in breadth first order from the start
+        # Copying the moves of the closures can multiply the transitions, a
+        # star over a union of n words gives every word end the n moves of
+        # the word starts. So once there would be more than max_growth
+        # times the transitions of this NFA, it is returned unchanged. The
+        # states of the closures walked are bounded the same way, with room
+        # for patterns of many optional parts whose closures are a few times
+        # bigger than the transitions they give, so the pass stays linear
+        started = instrumentation.start()
+        no_symbol = self.no_alphabet - 1
+        epsilon = self.transition_table[no_symbol]
+        is_final = bytearray(self.no_state)
+        for x in self.finals:
+            is_final[self.states_dict[x]] = 1
+
+        # (alphabet, To State) pairs of the moves of every state on an
+        # alphabet, without their epsilon closures
+        out = [list() for x in range(self.no_state)]
+        for from_state, al, to_state in self.transitions:
+            al = self.alphabets_dict[al]
+            if al != no_symbol:
+                out[self.states_dict[from_state]].append(
+                    (al, self.states_dict[to_state]))
+
+        # A state that is not final, has no move on an alphabet and one
+        # epsilon transition adds nothing to a closure but the closure of
+        # the state after it. jump[x] skips chains of such states, so that
+        # long chains like the ends of a union of many words are not walked
+        # again for every closure. A cycle of them stops at one of its states
+        jump = array('i', [-1]) * self.no_state
+        for x in range(self.no_state):
+            path = list()
+            y = x
+            while (jump[y] == -1 and not out[y] and not is_final[y] and
+                   len(epsilon[y]) == 1):
+                jump[y] = -2
+                path.append(y)
+                y = epsilon[y][0]
+            if jump[y] < 0:
+                jump[y] = y
+            for z in path:
+                if z != y:
+                    jump[z] = jump[y]
+
+        # Breadth first search over the kept states, moves[i] is the list
+        # of (alphabet, sorted To States) moves of the i-th one found and
+        # accepted[i] the final states of its closure. The closure of each
+        # kept state is walked once, marks[x] is the last kept state whose
+        # closure has state x
+        start = self.states_dict[self.start]
+        order = [start]
+        ids = {start: 0}
+        moves = list()
+        accepted = list()
+        marks = array('i', [-1]) * self.no_state
+        budget = max_growth * max(self.no_transition, 1)
+        closure_budget = 8 * budget
+        cur = 0
+        while (cur < len(order)):
+            closure = [order[cur]]
+            marks[order[cur]] = cur
+            for x in closure:
+                for y in epsilon[x]:
+                    y = jump[y]
+                    if marks[y] != cur:
+                        marks[y] = cur
+                        closure.append(y)
+            row = dict()
+            for x in closure:
+                for al, y in out[x]:
+                    row.setdefault(al, set()).add(y)
+            budget -= sum(len(to) for to in row.values())
+            closure_budget -= len(closure)
+            if budget < 0 or closure_budget < 0:
+                instrumentation.finish("remove_epsilon", started,
+                                       remove_epsilon_fallbacks=1)
+                return self
+            row = [(al, sorted(row[al])) for al in sorted(row)]
+            for al, to_states in row:
+                for y in to_states:
+                    if y not in ids:
+                        ids[y] = len(order)
+                        order.append(y)
+            moves.append(row)
+            accepted.append(sorted(x for x in closure if is_final[x]))
+            cur += 1
+
+        # Walking the moves backwards from the final states to find the
+        # states that can reach one, the start state is always kept
+        predecessors = [list() for i in range(len(order))]
+        for i in range(len(order)):
+            for al, to_states in moves[i]:
+                for y in to_states:
+                    predecessors[ids[y]].append(i)
+        live = [False] * len(order)
+        stack = [i for i in range(len(order)) if len(accepted[i]) > 0]
+        for i in stack:
+            live[i] = True
+        while (len(stack) > 0):
+            for i in predecessors[stack.pop()]:
+                if not live[i]:
+                    live[i] = True
+                    stack.append(i)
+        live[0] = True
+        names = dict()
+        for i in range(len(order)):
+            if live[i]:
+                names[order[i]] = "q" + str(len(names) + 1)
+
+        # The quintuple of the epsilon free NFA, a final state gets the
+        # tags of every final state in its closure
+        states = list(names.values())
+        transitions = list()
+        finals = list()
+        final_tags = None if self.final_tags is None else list()
+        for i in range(len(order)):
+            if not live[i]:
+                continue
+            name = names[order[i]]
+            for al, to_states in moves[i]:
+                for y in to_states:
+                    if y in names:
+                        transitions.append([name, self.alphabets[al], names[y]])
+            if len(accepted[i]) == 0:
+                continue
+            if final_tags is None:
+                finals.append(name)
+                continue
+            for tag in sorted(set(tag for x in accepted[i]
+                                  for tag in self.final_tags[x])):
+                finals.append(name)
+                final_tags.append(tag)
+
+        nfa = NFA(len(states), states, no_symbol, self.alphabets[:-1],
+                  states[0], len(finals), finals, len(transitions),
+                  transitions, final_tags, self.epsilon)
+        nfa.prefix = self.prefix
+        nfa.required = self.required
+        instrumentation.finish("remove_epsilon", started,
+                               reduced_nfa_states=nfa.no_state,
+                               reduced_nfa_transitions=nfa.no_transition)
+        return nfa
+
+    def draw(self, filename='nfa', view=False, max_states=MAX_DRAW_STATES,
+             sample=False):
+
+        # Method to draw the NFA diagram and render it to filename.pdf
+        # Raises ValueError for more than max_states states, unless sample
+        # is set, in which case only the max_states states closest to the
+        # start state are drawn and edges leaving them go to a '…' node
+        def successors(x):
+            for table in self.transition_table:
+                yield from table[x]
+
+        order = sampleStates(self.no_state, self.states_dict[self.start],
+                             successors, max_states, sample)
+        drawn = set(order)
+        graph = newDigraph()
+
+        # Adding states/nodes in NFA diagram
+        # If state is not a final state, then border shape is single circle
+        # Else it is double circle
+        for x in order:
+            if (self.finals_mask >> x) & 1:
+                graph.attr('node', shape='doublecircle')
+            else:
+                graph.attr('node', shape='circle')
+            graph.node(self.states[x])
+
+        # Adding start state arrow in NFA diagram
+        graph.attr('node', shape='none')
+        graph.node('')
+        graph.edge('', self.start)
+        if len(drawn) < self.no_state:
+            graph.node('…')
+
+        # Adding edge between states in NFA from the transition table
+        for al in range(self.no_alphabet):
+            label = 'ε' if al == self.no_alphabet - 1 else self.alphabets[al]
+            for x in order:
+                for y in self.transition_table[al][x]:
+                    to_name = self.states[y] if y in drawn else '…'
+                    graph.edge(self.states[x], to_name, label=label)
+
+        graph.render(filename, view=view)
+        return graph
+
+
+class DFA:
+    # Id of the dead state ϕ, every DFA built here has it as state 0
+    # so that a failed match can be detected without a second lookup
+    DEAD = 0
+
+    # Binary format written by save, all numbers are little endian:
+    # header (magic, version, flags, no_symbol, no_state, start),
+    # symbols (byte length + UTF-8 bytes each), finals (one byte per state)
+    # and the int32 transition table, each section padded to 4 bytes.
+    # With the ACCEPTS flag, the table is followed by the accepted regexes
+    # of every state as int32 offsets (no_state + 1) and int32 indexes
+    MAGIC = b'RDFA'
+    FORMAT_VERSION = 2
+    HEADER = struct.Struct('<4sHHIII')
+    ACCEPTS = 1
+
+    def __init__(self, symbols, no_state, start, finals, table, names=None,
+                 accepts=None):
+        self.symbols = symbols
+        self.no_symbol = len(symbols)
+        self.no_state = no_state
+        self.start = start
+        self.names = names
+
+        # For a DFA of a set of regexes, accepts[state] is the tuple of
+        # the indexes of the regexes matched in that state
+        self.accepts = accepts
+
+        # Literal every match starts with and literals every match contains,
+        # see NFA
+        self.prefix = ''
+        self.required = []
+
+        # One extra symbol class for characters outside the alphabet,
+        # its column always leads to the dead state
+        self.width = self.no_symbol + 1
+        self.other = self.no_symbol
+
+        # finals[state] is 1 if the state is a final state
+        self.finals = bytearray(no_state)
+        for x in finals:
+            self.finals[x] = 1
+
+        # transition table is a flat array of the form
+        # table[state * width + symbol class] -> To State
+        self.table = table
+
+        # Symbol class map, keyed by both the character and its code point
+        # so that str and bytes input can be stepped with the same lookup
+        self.classes = symbolClasses(self.symbols)
+
+    # Method to build the DFA from the result of the subset construction
+    # dfa_states is the list of NFA state lists and dfa_transitions the
+    # list of (from state, alphabet index, to state) triples indexing it
+    @classmethod
+    def fromSubsets(cls, nfa, dfa_states, dfa_transitions):
+        # Epsilon (the last alphabet) is not an input symbol of the DFA
+        symbols = nfa.alphabets[:-1]
+
+        # DFA state i of the construction gets id i + 1, 0 is kept for ϕ
+        names = ['ϕ']
+        finals = list()
+        accepts = None
+        if nfa.final_tags is not None:
+            accepts = [()]
+        for state in dfa_states:
+            if nfa.isFinalDFA(state):
+                finals.append(len(names))
+            names.append(nfa.getStateName(state))
+            if accepts is not None:
+                accepts.append(tuple(sorted(set(
+                    tag for x in state for tag in nfa.final_tags.get(x, ())))))
+
+        width = len(symbols) + 1
+        table = array('i', [cls.DEAD]) * (len(names) * width)
+        for from_state, al, to_state in dfa_transitions:
+            table[(from_state + 1) * width + al] = to_state + 1
+
+        start = 1
+        dfa = cls(symbols, len(names), start, finals, table, names, accepts)
+        dfa.prefix = nfa.prefix
+        dfa.required = nfa.required
+        return dfa
+
+    # Method to get the DFA from a dictionary made by toDict
+    @classmethod
+    def fromDict(cls, dfa_json):
+        accepts = dfa_json.get("accepts")
+        if accepts is not None:
+            accepts = [tuple(x) for x in accepts]
+        dfa = cls(dfa_json["symbols"], dfa_json["no_state"], dfa_json["start"],
+                  dfa_json["finals"], array('i', dfa_json["table"]),
+                  dfa_json.get("names"), accepts)
+        dfa.prefix = dfa_json.get("prefix", '')
+        dfa.required = dfa_json.get("required", [])
+        return dfa
+
+    # Method to get the DFA as a dictionary that can be saved as JSON
+    def toDict(self):
+        return {
+            "symbols": self.symbols,
+            "no_state": self.no_state,
+            "start": self.start,
+            "finals": [x for x in range(self.no_state) if self.finals[x]],
+            "table": self.table.tolist(),
+            "names": self.names,
+            "accepts": self.accepts,
+            "prefix": self.prefix,
+            "required": self.required
+        }
+
+    # Method to get the DFA in the binary format
+    def toBytes(self):
+        flags = self.ACCEPTS if self.accepts is not None else 0
+        data = bytearray(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION,
+                                          flags, self.no_symbol, self.no_state,
+                                          self.start))
+        for symbol in self.symbols:
+            encoded = symbol.encode('utf-8')
+            data += struct.pack('<I', len(encoded)) + encoded
+        data += bytes(-len(data) % 4)
+        data += bytes(self.finals)
+        data += bytes(-len(data) % 4)
+        table = array('i', self.table)
+        if sys.byteorder != 'little':
+            table.byteswap()
+        data += table.tobytes()
+        if self.accepts is not None:
+            offsets = array('i', [0])
+            indexes = array('i')
+            for accept in self.accepts:
+                indexes.extend(accept)
+                offsets.append(len(indexes))
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+                indexes.byteswap()
+            data += offsets.tobytes() + indexes.tobytes()
+        return bytes(data)
+
+    # Method to write the DFA to a file in the binary format
+    def save(self, filename):
+        with open(filename, 'wb') as file:
+            file.write(self.toBytes())
+
+    # Method to get the DFA from a buffer in the binary format, the
+    # transition table is a view of the buffer and is not copied
+    # A damaged buffer raises ValueError: every section must fit in it and
+    # every state in the table must be below no_state
+    @classmethod
+    def fromBuffer(cls, buffer):
+        view = memoryview(buffer)
+        if len(view) < cls.HEADER.size:
+            raise ValueError("not a compiled DFA")
+        magic, version, flags, no_symbol, no_state, start = \
+            cls.HEADER.unpack_from(view)
+        if magic != cls.MAGIC:
+            raise ValueError("not a compiled DFA")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError("unsupported compiled DFA version " + str(version))
+        if no_state < 1 or start >= no_state:
+            raise ValueError("compiled DFA has a bad header")
+
+        # Returns the size bytes of the section at offset, if they fit
+        def section(offset, size):
+            if offset + size > len(view):
+                raise ValueError("compiled DFA is truncated")
+            return view[offset:offset + size]
+
+        offset = cls.HEADER.size
+        symbols = list()
+        for i in range(no_symbol):
+            size, = struct.unpack('<I', section(offset, 4))
+            offset += 4
+            symbols.append(bytes(section(offset, size)).decode('utf-8'))
+            offset += size
+        offset += -offset % 4
+        finals = [x for x, final in enumerate(section(offset, no_state))
+                  if final]
+        offset += no_state
+        offset += -offset % 4
+
+        size = no_state * (no_symbol + 1) * 4
+        if sys.byteorder == 'little':
+            table = section(offset, size).cast('i')
+        else:
+            table = array('i', section(offset, size).tobytes())
+            table.byteswap()
+        offset += size
+        if min(table) < 0 or max(table) >= no_state:
+            raise ValueError("compiled DFA has a transition to a bad state")
+
+        accepts = None
+        if flags & cls.ACCEPTS:
+            size = (no_state + 1) * 4
+            offsets = array('i', section(offset, size).tobytes())
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            offset += size
+            if offsets[0] != 0 or any(offsets[x] > offsets[x + 1]
+                                      for x in range(no_state)):
+                raise ValueError("compiled DFA has bad accept offsets")
+            size = offsets[-1] * 4
+            indexes = array('i', section(offset, size).tobytes())
+            if sys.byteorder != 'little':
+                indexes.byteswap()
+            accepts = [tuple(indexes[offsets[x]:offsets[x + 1]])
+                       for x in range(no_state)]
+        dfa = cls(symbols, no_state, start, finals, table, None, accepts)
+
+        # Keep the buffer alive as long as the table views it
+        dfa.buffer = buffer
+        return dfa
+
+    # Method to map a file in the binary format into memory, processes that
+    # load the same file share its pages read-only
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.fromBuffer(buffer)
+
+    # Method to represent the transition table
+    def __repr__(self):
+        # DFAs loaded from the binary format have no state names
+        names = self.names or [str(x) for x in range(self.no_state)]
+        return "Q : " + str(names) + "\nΣ : " + str(self.symbols) + "\nq0 : " + str(
+            names[self.start]) + "\nF : " + str(
+            [names[x] for x in range(self.no_state) if self.finals[x]])
+
+    # Methods to write the transition table, the δ' listing and exports of
+    # the DFA to a text file, all read straight from the table built by the
+    # construction, one row of the table per write
+
+    def writeTable(self, file):
+        # Method to write the transition table, one row per state but ϕ
+        names = self.names or [str(x) for x in range(self.no_state)]
+        width = self.width
+        file.write("{:<10} |".format("") + "".join(
+            "{:<10} |".format(symbol) for symbol in self.symbols) + "\n")
+        file.write("-" * (12 * width) + "\n")
+        for x in range(self.no_state):
+            if x == self.DEAD:
+                continue
+            row = self.table[x * width:x * width + self.no_symbol]
+            file.write("{:<10} |".format(names[x]) + "".join(
+                "{:<10} |".format(names[y]) for y in row) + "\n")
+
+    def writeTransitions(self, file):
+        # Method to write the δ' transition of every state but ϕ on every symbol
+        names = self.names or [str(x) for x in range(self.no_state)]
+        width = self.width
+        for x in range(self.no_state):
+            if x == self.DEAD:
+                continue
+            lines = list()
+            for al in range(self.no_symbol):
+                lines.append("The δ' transition for state {} is obtained as:\n"
+                             "δ'({}, {}) = {}\n".format(
+                                 names[x], names[x], self.symbols[al],
+                                 names[self.table[x * width + al]]))
+            lines.append("\n")
+            file.write("".join(lines))
+
+    def writeCSV(self, file):
+        # Method to write the transition table as CSV, a header row with
+        # the symbols, then one row per state with its name, whether it
+        # is final and the name of the To State on every symbol
+        import csv
+        names = self.names or [str(x) for x in range(self.no_state)]
+        width = self.width
+        writer = csv.writer(file)
+        writer.writerow(["state", "final"] + self.symbols)
+        for x in range(self.no_state):
+            row = self.table[x * width:x * width + self.no_symbol]
+            writer.writerow([names[x], self.finals[x]] +
+                            [names[y] for y in row])
+
+    def writeJSON(self, file):
+        # Method to write the DFA in the format of output.json, with state
+        # names and (from state, symbol, to state) transitions, so it can
+        # be read back with NFA.fromDict. The transitions are written one
+        # at a time instead of building the whole document first
+        import json
+        names = self.names or [str(x) for x in range(self.no_state)]
+        width = self.width
+        finals = [names[x] for x in range(self.no_state) if self.finals[x]]
+        file.write('{\n  "no_state": ' + json.dumps(self.no_state) +
+                   ',\n  "states": ' + json.dumps(names, ensure_ascii=False) +
+                   ',\n  "no_alphabet": ' + json.dumps(self.no_symbol) +
+                   ',\n  "alphabets": ' + json.dumps(self.symbols,
+                                                     ensure_ascii=False) +
+                   ',\n  "start": ' + json.dumps(names[self.start],
+                                                 ensure_ascii=False) +
+                   ',\n  "no_final": ' + json.dumps(len(finals)) +
+                   ',\n  "finals": ' + json.dumps(finals, ensure_ascii=False) +
+                   ',\n  "no_transition": ' +
+                   json.dumps(self.no_state * self.no_symbol) +
+                   ',\n  "transitions": [')
+        separator = '\n    '
+        for x in range(self.no_state):
+            for al in range(self.no_symbol):
+                file.write(separator + json.dumps(
+                    [names[x], self.symbols[al],
+                     names[self.table[x * width + al]]], ensure_ascii=False))
+                separator = ',\n    '
+        file.write('\n  ],\n  "epsilon": ""\n}\n')
+
+    def draw(self, filename='dfa', view=False, max_states=MAX_DRAW_STATES,
+             sample=False):
+
+        # Method to draw the DFA diagram and render it to filename.pdf
+        # The dead state ϕ is drawn only if it is reached, characters
+        # outside the alphabet are not drawn. Huge DFAs are refused or
+        # sampled as in NFA.draw
+        width = self.width
+        names = self.names or [str(x) for x in range(self.no_state)]
+
+        def successors(x):
+            return self.table[x * width:x * width + self.no_symbol]
+
+        order = sampleStates(self.no_state, self.start, successors,
+                             max_states, sample)
+        drawn = set(order)
+        graph = newDigraph()
+
+        # Adding states/nodes in DFA diagram, final states are double circles
+        for x in order:
+            if self.finals[x]:
+                graph.attr('node', shape='doublecircle')
+            else:
+                graph.attr('node', shape='circle')
+            graph.node(names[x])
+
+        # Adding start state arrow to start state in DFA
+        graph.attr('node', shape='none')
+        graph.node('')
+        graph.edge('', names[self.start])
+        if len(drawn) < self.no_state:
+            graph.node('…')
+
+        # Adding edge between from state and to state,
+        # ϕ has all its transitions to itself
+        for x in order:
+            for al in range(self.no_symbol):
+                y = self.table[x * width + al]
+                to_name = names[y] if y in drawn else '…'
+                graph.edge(names[x], to_name, label=self.symbols[al])
+
+        graph.render(filename, view=view)
+        return graph
+
+    def minimize(self):
+
+        # Method to merge equivalent states using Hopcroft's partition
+        # refinement, returns the minimal DFA and a list mapping every state
+        # of this DFA to its state in the minimal one
+        started = instrumentation.start()
+        width = self.width
+        table = self.table
+
+        # Predecessors of every state on every alphabet, the column of
+        # characters outside the alphabet is refined like an alphabet
+        inverse = [[list() for x in range(self.no_state)]
+                   for al in range(width)]
+        for x in range(self.no_state):
+            for al in range(width):
+                inverse[al][table[x * width + al]].append(x)
+
+        # Initial partition is final and non final states, or for a DFA
+        # of a set of regexes the states grouped by the regexes they accept
+        keys = dict()
+        blocks = list()
+        block_of = array('i', [0]) * self.no_state
+        for x in range(self.no_state):
+            key = self.accepts[x] if self.accepts is not None else self.finals[x]
+            if key not in keys:
+                keys[key] = len(blocks)
+                blocks.append(set())
+            blocks[keys[key]].add(x)
+            block_of[x] = keys[key]
+
+        # Worklist of (block, alphabet) splitters, every initial block
+        # but the largest one is needed as splitter
+        largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+        worklist = [(b, al) for b in range(len(blocks)) if b != largest
+                    for al in range(width)]
+        in_worklist = set(worklist)
+
+        while (len(worklist) > 0):
+            splitter = worklist.pop()
+            in_worklist.discard(splitter)
+            b, al = splitter
+
+            # Group the states that move into block b on al by their block
+            touched = dict()
+            for x in blocks[b]:
+                for y in inverse[al][x]:
+                    touched.setdefault(block_of[y], list()).append(y)
+
+            # Split every block that is only partly moved into block b
+            for c, moved in touched.items():
+                if len(moved) == len(blocks[c]):
+                    continue
+                new = len(blocks)
+                blocks[c].difference_update(moved)
+                blocks.append(set(moved))
+                for y in moved:
+                    block_of[y] = new
+                for al2 in range(width):
+                    if (c, al2) in in_worklist:
+                        worklist.append((new, al2))
+                        in_worklist.add((new, al2))
+                    else:
+                        # Splitting on the smaller half is enough
+                        if len(blocks[new]) <= len(blocks[c]):
+                            worklist.append((new, al2))
+                            in_worklist.add((new, al2))
+                        else:
+                            worklist.append((c, al2))
+                            in_worklist.add((c, al2))
+
+        # Number the blocks in the order of their first state,
+        # so the block of the dead state ϕ stays state 0
+        mapping = [-1] * self.no_state
+        ids = dict()
+        names = list()
+        for x in range(self.no_state):
+            b = block_of[x]
+            if b not in ids:
+                ids[b] = len(names)
+                names.append(self.names[x] if self.names else str(x))
+            mapping[x] = ids[b]
+
+        no_state = len(names)
+        new_table = array('i', [self.DEAD]) * (no_state * width)
+        new_finals = list()
+        new_accepts = [()] * no_state if self.accepts is not None else None
+        done = bytearray(no_state)
+        for x in range(self.no_state):
+            if done[mapping[x]]:
+                continue
+            done[mapping[x]] = 1
+            if self.finals[x]:
+                new_finals.append(mapping[x])
+            if new_accepts is not None:
+                new_accepts[mapping[x]] = self.accepts[x]
+            for al in range(width):
+                new_table[mapping[x] * width + al] = \
+                    mapping[table[x * width + al]]
+
+        minimal = DFA(self.symbols, no_state, mapping[self.start],
+                      new_finals, new_table, names, new_accepts)
+        minimal.prefix = self.prefix
+        minimal.required = self.required
+        instrumentation.finish("minimize", started, minimal_states=no_state)
+        return minimal, mapping
+
+    def countRun(self, state):
+        # Method to count a run of a matcher that ended in state,
+        # only called when instrumentation is enabled
+        instrumentation.count("dfa_runs")
+        if state == self.DEAD:
+            instrumentation.count("dfa_dead_state_hits")
+
+    def fullmatch(self, text):
+        # Method to check if the whole text is accepted by the DFA
+        table = self.table
+        classes = self.classes
+        width = self.width
+        other = self.other
+        state = self.start
+        for c in text:
+            state = table[state * width + classes.get(c, other)]
+            if state == 0:
+                break
+        if instrumentation.active is not None:
+            self.countRun(state)
+        return self.finals[state] == 1
+
+    def match(self, text, pos=0):
+        # Method to get the end of the longest match starting at pos,
+        # returns -1 if no prefix of text[pos:] is accepted
+        table = self.table
+        classes = self.classes
+        finals = self.finals
+        width = self.width
+        other = self.other
+        state = self.start
+        end = pos if finals[state] else -1
+        for i in range(pos, len(text)):
+            state = table[state * width + classes.get(text[i], other)]
+            if state == 0:
+                break
+            if finals[state]:
+                end = i + 1
+        if instrumentation.active is not None:
+            self.countRun(state)
+        return end
+
+    def search(self, text, pos=0):
+        # Method to get the leftmost longest match in text as a
+        # (start, end) pair, returns None if there is no match
+        return literalSearch(self, text, pos)
+
+    def scan(self, text, pos=0):
+
+        # Method to get the leftmost longest match in text[pos:] as a
+        # (start, end) pair in O(n·m) time for n characters and m states,
+        # returns None if there is no match
+        # A run of the DFA is started at every position until a match is
+        # found, and all the runs are stepped together. A state reached by
+        # several runs keeps only the earliest start, since the runs are the
+        # same from there on, so there are never more than m runs
+        if pos > len(text):
+            return None
+        classes = self.classes
+        width = self.width
+        other = self.other
+        table = self.table
+        finals = self.finals
+
+        # runs maps the state of every run to its start, best is the
+        # earliest start that reached a final state and its longest end
+        runs = dict()
+        best = None
+        i = pos
+        while True:
+            if best is None and self.start not in runs:
+                runs[self.start] = i
+            for state, start in runs.items():
+                if finals[state] and (best is None or start <= best[0]):
+                    best = (start, i)
+            if i == len(text) or (len(runs) == 0 and best is not None):
+                break
+            cls = classes.get(text[i], other)
+            following = dict()
+            for state, start in runs.items():
+                to = table[state * width + cls]
+                if to == self.DEAD or (best is not None and start > best[0]):
+                    continue
+                if start < following.get(to, i + 1):
+                    following[to] = start
+            runs = following
+            i += 1
+        if best is None and instrumentation.active is not None:
+            instrumentation.count("scan_rejects")
+        return best
+
+    def fullmatchAll(self, text):
+        # Method to get the indexes of the regexes of a set that match
+        # the whole text, in a single pass over it
+        table = self.table
+        classes = self.classes
+        width = self.width
+        other = self.other
+        state = self.start
+        for c in text:
+            state = table[state * width + classes.get(c, other)]
+            if state == 0:
+                break
+        if instrumentation.active is not None:
+            self.countRun(state)
+        return self.accepts[state]
+
+    def matchAll(self, text, pos=0):
+        # Method to get the indexes of the regexes of a set that match
+        # a prefix of text[pos:], in a single pass over it
+        table = self.table
+        classes = self.classes
+        accepts = self.accepts
+        width = self.width
+        other = self.other
+        state = self.start
+        matched = set(accepts[state])
+        for i in range(pos, len(text)):
+            state = table[state * width + classes.get(text[i], other)]
+            if state == 0:
+                break
+            if accepts[state]:
+                matched.update(accepts[state])
+        if instrumentation.active is not None:
+            self.countRun(state)
+        return sorted(matched)
+
+
+class StreamMatcher:
+    # Matcher that is fed its input in chunks and keeps only the current
+    # state between them. Unless anchored, it reports the offsets in the
+    # whole stream where a match of the DFA ends, otherwise the offsets
+    # where a prefix of the stream is accepted. str chunks are stepped by
+    # character and bytes-like chunks (bytes, memoryview, mmap) by byte
+    # without being copied
+    # Unanchored, the state is the set of states of the runs of the DFA
+    # started at every offset so far, at most one run per state. The steps
+    # of these sets are cached, up to max_cache of them, so the set of an
+    # unanchored DFA is only built for the sets the stream reaches
+    def __init__(self, dfa, anchored=False, max_cache=10000):
+        self.dfa = dfa
+        self.anchored = anchored
+        self.max_cache = max_cache
+        self.cache = dict()
+        self.reset()
+
+    def reset(self):
+        # Method to start matching a new stream
+        if self.anchored:
+            self.state = self.dfa.start
+        else:
+            self.state = frozenset([self.dfa.start])
+        self.offset = 0
+
+    def step(self, states, cls):
+        # Method to step the runs of states on a symbol class and start a
+        # new one, returns the next set of states and None if no match ends
+        # there, else True (the regexes matched, for a DFA of a set of
+        # regexes)
+        dfa = self.dfa
+        following = set([dfa.start])
+        for x in states:
+            y = dfa.table[x * dfa.width + cls]
+            if y != dfa.DEAD:
+                following.add(y)
+        matched = None
+        if any(dfa.finals[x] for x in following):
+            matched = True
+            if dfa.accepts is not None:
+                matched = tuple(sorted(set(
+                    tag for x in following for tag in dfa.accepts[x])))
+        return frozenset(following), matched
+
+    def feed(self, chunk):
+        # Method to match the next chunk of the stream, returns the list of
+        # match end offsets in it, or (offset, regexes) pairs for a DFA of
+        # a set of regexes
+        if not isinstance(chunk, str):
+            chunk = memoryview(chunk).cast('B')
+        dfa = self.dfa
+        classes = dfa.classes
+        accepts = dfa.accepts
+        other = dfa.other
+        state = self.state
+        offset = self.offset
+        found = list()
+
+        if not self.anchored:
+            cache = self.cache
+            i = offset
+            for c in chunk:
+                i += 1
+                key = (state, classes.get(c, other))
+                following = cache.get(key)
+                if following is None:
+                    if len(cache) >= self.max_cache:
+                        cache.clear()
+                        instrumentation.count("stream_cache_flushes")
+                    following = cache[key] = self.step(*key)
+                state, matched = following
+                if matched is not None:
+                    found.append(i if accepts is None else (i, matched))
+        elif state != 0:
+            table = dfa.table
+            finals = dfa.finals
+            width = dfa.width
+            i = offset
+            for c in chunk:
+                i += 1
+                state = table[state * width + classes.get(c, other)]
+                if finals[state]:
+                    found.append(i if accepts is None else (i, accepts[state]))
+                elif state == 0:
+                    break
+
+        if instrumentation.active is not None:
+            instrumentation.count("stream_chunks")
+            if state == 0 and self.state != 0:
+                instrumentation.count("dfa_dead_state_hits")
+        self.state = state
+        self.offset = offset + len(chunk)
+        return found
+
+    def finish(self):
+        # Method to end the stream, returns True if the stream ends with a
+        # match (the whole stream matched, when anchored)
+        if self.anchored:
+            accepted = self.dfa.finals[self.state] == 1
+        else:
+            accepted = any(self.dfa.finals[x] for x in self.state)
+        self.reset()
+        return accepted
+
+
+class LazyDFA:
+    # DFA whose states are built from the NFA only when the input reaches
+    # them, kept in a cache of at most max_states states. When the cache is
+    # full it is flushed, and if it fills up again in less than
+    # thrash_ratio characters per state the rest of the input is matched
+    # by simulating the NFA instead
+    DEAD = 0
+    UNKNOWN = -1
+
+    def __init__(self, nfa, max_states=10000, thrash_ratio=10):
+        self.nfa = nfa
+        if nfa.step_masks is None:
+            nfa.getClosureMasks()
+        self.symbols = nfa.alphabets[:-1]
+        self.no_symbol = len(self.symbols)
+        self.width = self.no_symbol + 1
+        self.other = self.no_symbol
+        self.max_states = max(max_states, 2)
+        self.thrash_ratio = thrash_ratio
+        self.start_mask = nfa.epsilon_closure[nfa.states_dict[nfa.start]]
+        self.prefix = nfa.prefix
+        self.required = nfa.required
+
+        # Symbol class map, same as the one of DFA
+        self.classes = symbolClasses(self.symbols)
+
+        # Characters matched so far and at the last flush,
+        # used to find out if the cache is thrashing
+        self.steps = 0
+        self.flush_steps = 0
+        self.flushes = 0
+        self.fallbacks = 0
+        self.flush()
+
+    def flush(self):
+        # Method to empty the cache, leaving only ϕ and the start state
+        self.ids = dict()
+        self.masks = list()
+        self.finals = bytearray()
+        self.table = list()
+        self.addState(0)
+        self.start = self.addState(self.start_mask)
+
+    def addState(self, mask):
+        # Method to add a set of NFA states to the cache,
+        # its transitions are filled in when they are first taken
+        state = len(self.masks)
+        self.ids[mask] = state
+        self.masks.append(mask)
+        self.finals.append(1 if mask & self.nfa.finals_mask else 0)
+        if mask:
+            self.table.extend([self.UNKNOWN] * self.no_symbol)
+            self.table.append(self.DEAD)
+        else:
+            self.table.extend([self.DEAD] * self.width)
+        return state
+
+    def getNext(self, state, cls, consumed):
+
+        # Method to build the transition of a cached state on a symbol class
+        # consumed is the number of characters matched by the caller so far
+        # Returns the To State, or -1 if the cache is thrashing
+        to_mask = self.nfa.getImage(self.masks[state], cls)
+        to = self.ids.get(to_mask)
+        if to is not None:
+            self.table[state * self.width + cls] = to
+            return to
+
+        # Cache is full, flush it unless it was flushed too recently
+        if len(self.masks) >= self.max_states:
+            steps = self.steps + consumed
+            if steps - self.flush_steps < self.thrash_ratio * self.max_states:
+                self.flush_steps = steps
+                self.fallbacks += 1
+                instrumentation.count("lazy_dfa_fallbacks")
+                return -1
+            self.flush_steps = steps
+            self.flushes += 1
+            instrumentation.count("lazy_dfa_flushes")
+            self.flush()
+            return self.addState(to_mask)
+
+        to = self.addState(to_mask)
+        self.table[state * self.width + cls] = to
+        return to
+
+    def simulate(self, mask, text, pos, end):
+
+        # Method to continue a match by stepping bitsets of NFA states,
+        # without adding anything to the cache
+        nfa = self.nfa
+        classes = self.classes
+        other = self.other
+        for i in range(pos, len(text)):
+            cls = classes.get(text[i], other)
+            mask = nfa.getImage(mask, cls) if cls != other else 0
+            if not mask:
+                break
+            if mask & nfa.finals_mask:
+                end = i + 1
+        return end
+
+    def match(self, text, pos=0):
+        # Method to get the end of the longest match starting at pos,
+        # returns -1 if no prefix of text[pos:] is accepted
+        classes = self.classes
+        width = self.width
+        other = self.other
+        table = self.table
+        finals = self.finals
+        state = self.start
+        end = pos if finals[state] else -1
+        misses = 0
+        for i in range(pos, len(text)):
+            cls = classes.get(text[i], other)
+            to = table[state * width + cls]
+            if to < 0:
+                misses += 1
+                to = self.getNext(state, cls, i - pos)
+                if to < 0:
+                    end = self.simulate(self.masks[state], text, i, end)
+                    self.steps += len(text) - pos
+                    if instrumentation.active is not None:
+                        self.countRun(i + 1 - pos, misses, state)
+                    return end
+                # The cache may have been flushed
+                table = self.table
+                finals = self.finals
+            state = to
+            if state == 0:
+                break
+            if finals[state]:
+                end = i + 1
+        self.steps += len(text) - pos
+        if instrumentation.active is not None:
+            self.countRun(i + 1 - pos if len(text) > pos else 0, misses, state)
+        return end
+
+    def countRun(self, steps, misses, state):
+        # Method to count a run of match that took steps cached transitions
+        # (misses of them were not in the cache) and ended in state,
+        # only called when instrumentation is enabled
+        instrumentation.count("dfa_runs")
+        instrumentation.count("lazy_dfa_cache_hits", steps - misses)
+        instrumentation.count("lazy_dfa_cache_misses", misses)
+        if state == self.DEAD:
+            instrumentation.count("dfa_dead_state_hits")
+
+    def fullmatch(self, text):
+        # Method to check if the whole text is accepted,
+        # which is when the longest match is the whole text
+        return self.match(text) == len(text)
+
+    def search(self, text, pos=0):
+        # Method to get the leftmost longest match in text as a
+        # (start, end) pair, returns None if there is no match
+        return literalSearch(self, text, pos)
+
+    def scan(self, text, pos=0):
+
+        # Method to get the leftmost longest match in text[pos:] as a
+        # (start, end) pair, returns None if there is no match
+        # The runs started at every position are stepped together through
+        # the cache, like in DFA.scan. If the cache is flushed or thrashes
+        # on the way, the runs go on as NFA states, see scanNFA
+        if pos > len(text):
+            return None
+        classes = self.classes
+        width = self.width
+        other = self.other
+        table = self.table
+        finals = self.finals
+        runs = dict()
+        best = None
+        i = pos
+        while True:
+            if best is None and self.start not in runs:
+                runs[self.start] = i
+            for state, start in runs.items():
+                if finals[state] and (best is None or start <= best[0]):
+                    best = (start, i)
+            if i == len(text) or (len(runs) == 0 and best is not None):
+                break
+            cls = classes.get(text[i], other)
+            masks = self.masks
+            following = dict()
+            for state, start in runs.items():
+                if best is not None and start > best[0]:
+                    continue
+                to = table[state * width + cls]
+                if to < 0:
+                    to = self.getNext(state, cls, i - pos)
+                    if to < 0 or self.masks is not masks:
+                        # The states of the runs are read from the masks
+                        # of the cache as it was before this step
+                        nfa_runs = dict()
+                        for cached, first in runs.items():
+                            for x in self.nfa.getStateList(masks[cached]):
+                                if first < nfa_runs.get(x, i + 1):
+                                    nfa_runs[x] = first
+                        self.steps += i - pos
+                        return self.scanNFA(nfa_runs, text, i, best)
+                if to == self.DEAD:
+                    continue
+                if start < following.get(to, i + 1):
+                    following[to] = start
+            runs = following
+            i += 1
+        self.steps += i - pos
+        if best is None and instrumentation.active is not None:
+            instrumentation.count("scan_rejects")
+        return best
+
+    def scanNFA(self, runs, text, i, best):
+
+        # Method to go on with the runs of scan from text[i] by stepping
+        # NFA states, without adding anything to the cache
+        # runs maps every NFA state reached to the earliest start that
+        # reached it, so there are never more runs than NFA states
+        nfa = self.nfa
+        classes = self.classes
+        other = self.other
+        finals = set(nfa.getStateList(nfa.finals_mask))
+        starting = nfa.getStateList(self.start_mask)
+        while True:
+            if best is None:
+                for x in starting:
+                    if x not in runs:
+                        runs[x] = i
+            for x, start in runs.items():
+                if x in finals and (best is None or start <= best[0]):
+                    best = (start, i)
+            if i == len(text) or (len(runs) == 0 and best is not None):
+                break
+            cls = classes.get(text[i], other)
+            following = dict()
+            if cls != other:
+                step = nfa.step_masks[cls]
+                for x, start in runs.items():
+                    if best is not None and start > best[0]:
+                        continue
+                    for y in nfa.getStateList(step[x]):
+                        if start < following.get(y, i + 1):
+                            following[y] = start
+            runs = following
+            i += 1
+        if best is None and instrumentation.active is not None:
+            instrumentation.count("scan_rejects")
+        return best
+
+
+def literalSearch(matcher, text, pos=0):
+    # returns the leftmost longest match of a DFA or LazyDFA in text as a
+    # (start, end) pair, None if there is no match
+    # A text missing one of the literals every match contains is rejected
+    # with find, and if every match starts with a literal prefix the scan
+    # of the matcher starts where it first occurs
+    prefix = matcher.prefix
+    required = matcher.required
+    if not isinstance(text, str) and (prefix or required):
+        if hasattr(text, 'find'):
+            # Bytes are stepped by their value, as the character of that
+            # code point, a literal with a bigger one can never be found
+            try:
+                prefix = prefix.encode('latin-1')
+                required = [x.encode('latin-1') for x in required]
+            except UnicodeEncodeError:
+                return None
+        else:
+            prefix = ''
+            required = []
+
+    for literal in required:
+        if text.find(literal, pos) == -1:
+            instrumentation.count("prefilter_rejects")
+            return None
+
+    if prefix:
+        pos = text.find(prefix, pos)
+        if pos == -1:
+            return None
+    return matcher.scan(text, pos)
+
+
+def determinize(nfa):
+    # Converts the NFA to a DFA with the subset construction
+    dfa_states, dfa_transitions = nfa.subsetConstruction()
+    return DFA.fromSubsets(nfa, dfa_states, dfa_transitions)
+
+
+def main():
+    print("E-NFA to DFA")
+
+    # Uncomment the following two lines to get input from the user
+    # nfa = NFA.fromUser() # To get input from user
+    # print(repr(nfa)) # To print the quintuple in console
+
+    # Uncomment the following two lines to get input from the user
+    nfa = NFA.fromUser()  # To get input from user
+    print(repr(nfa))  # To print the quintuple in console
+
+    # Subset construction, without drawing anything
+    dfa_states, dfa_transitions = nfa.subsetConstruction()
+
+    # Table-driven DFA that can be run against input strings
+    # using match, fullmatch and search
+    dfa_machine = DFA.fromSubsets(nfa, dfa_states, dfa_transitions)
+
+    # Merging equivalent states of the DFA and showing which
+    # states of the subset construction became one state
+    minimal_dfa, state_mapping = dfa_machine.minimize()
+    print("\nMinimized DFA: {} states -> {} states".format(
+        dfa_machine.no_state, minimal_dfa.no_state))
+    for state in range(minimal_dfa.no_state):
+        merged = [dfa_machine.names[x] for x in range(dfa_machine.no_state)
+                  if state_mapping[x] == state]
+        print("{:<10} = {{{}}}".format("M" + str(state), ", ".join(merged)))
+
+    # Drawing the diagrams is opt-in, as it needs graphviz and the dot
+    # program, makes nfa.pdf and dfa.pdf and views them
+    if "--draw" in sys.argv:
+        nfa.draw('nfa', view=True)
+        dfa_machine.draw('dfa', view=True)
+
+    # Display transition table for DFA and the transition functions of
+    # each state, read from the table of the DFA instead of recomputed
+    out = sys.stdout
+    out.write("\nTransition Table for DFA:\n")
+    dfa_machine.writeTable(out)
+    dfa_machine.writeTransitions(out)
+
+    # Exporting the transition table with --csv FILE and --json FILE
+    for option, write in (("--csv", dfa_machine.writeCSV),
+                          ("--json", dfa_machine.writeJSON)):
+        if option in sys.argv[:-1]:
+            filename = sys.argv[sys.argv.index(option) + 1]
+            with open(filename, 'w', newline='', encoding='utf-8',
+                      buffering=1 << 16) as file:
+                write(file)
+
+
+if __name__ == "__main__":
+    main()
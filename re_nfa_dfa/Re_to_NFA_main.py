@@ -0,0 +1,796 @@
+import sys
+from . import instrumentation
+from .NFA_to_DFA_main import (NFA, MAX_DRAW_STATES, newDigraph, sampleStates,
+                              symbolClasses)
+
+# Symbol of the epsilon transitions, the empty string can never be a
+# character of the input, so every character can be used as a symbol
+EPSILON = ''
+
+class charType:
+    SYMBOL = 1
+    CONCAT = 2
+    UNION  = 3
+    KLEENE = 4
+    EMPTY  = 5
+
+class tokenType:
+    SYMBOL = 1
+    UNION  = 2
+    CONCAT = 3
+    STAR   = 4
+    REPEAT = 5
+    OPEN   = 6
+    CLOSE  = 7
+
+# Characters written with a backslash before them to be read as symbols
+special_chars = '\\+|*?.(){}[]'
+
+# Escapes of control characters and of the \d, \w and \s classes, classes
+# are tuples of (first, last) code point ranges
+escape_chars = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+escape_classes = {
+    'd': ((48, 57),),
+    'w': ((48, 57), (65, 90), (95, 95), (97, 122)),
+    's': ((9, 13), (32, 32)),
+}
+
+class NFAState:
+    def __init__(self):
+        self.next_state = {}
+
+class ExpressionTree:
+    def __init__(self, charType, value=None):
+        self.charType = charType
+        self.value = value
+        self.left = None
+        self.right = None
+
+def merge_ranges(ranges):
+    # returns the ranges sorted, with overlapping and adjacent ones merged
+    merged = []
+    for lo, hi in sorted(ranges):
+        if len(merged) > 0 and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+def read_escape(regex, i):
+    # reads the escape after a backslash at regex[i - 1], returns its
+    # ranges and the index after it
+    if i >= len(regex):
+        raise ValueError("regex ends with a backslash")
+    c = regex[i]
+    if c in escape_classes:
+        return escape_classes[c], i + 1
+    c = escape_chars.get(c, c)
+    return ((ord(c), ord(c)),), i + 1
+
+def read_class(regex, i):
+    # reads the character class after the '[' at regex[i - 1], returns its
+    # ranges and the index after the closing ']', a ']' right after the
+    # '[' is a symbol of the class
+    if i < len(regex) and regex[i] == '^':
+        raise ValueError("negated character classes are not supported, "
+                         "characters outside the alphabet never match")
+    ranges = []
+    first = True
+    while True:
+        if i >= len(regex):
+            raise ValueError("unterminated character class")
+        if regex[i] == ']' and not first:
+            return merge_ranges(ranges), i + 1
+        first = False
+        if regex[i] == '\\':
+            item, i = read_escape(regex, i + 1)
+        else:
+            item, i = ((ord(regex[i]), ord(regex[i])),), i + 1
+
+        # a single character followed by '-' and another one is a range
+        if (len(item) == 1 and item[0][0] == item[0][1] and
+                i + 1 < len(regex) and regex[i] == '-' and regex[i + 1] != ']'):
+            if regex[i + 1] == '\\':
+                last, i = read_escape(regex, i + 2)
+            else:
+                last, i = ((ord(regex[i + 1]), ord(regex[i + 1])),), i + 2
+            if len(last) != 1 or last[0][0] != last[0][1] or last[0][0] < item[0][0]:
+                raise ValueError("bad range in character class")
+            item = ((item[0][0], last[0][0]),)
+        ranges.extend(item)
+
+def read_repeat(regex, i):
+    # reads the bounds of {m}, {m,} or {m,n} after the '{' at regex[i - 1],
+    # returns them as (m, n) with n None if unbounded and the index after
+    # the '}', or None if it is not a repetition (the '{' is then a symbol)
+    end = regex.find('}', i)
+    if end == -1:
+        return None
+    bounds = regex[i:end].split(',')
+    if len(bounds) > 2 or not bounds[0].isdigit():
+        return None
+    low = int(bounds[0])
+    if len(bounds) == 1:
+        high = low
+    elif bounds[1] == '':
+        high = None
+    elif bounds[1].isdigit():
+        high = int(bounds[1])
+    else:
+        return None
+    if high is not None and high < low:
+        raise ValueError("bad repetition {" + regex[i:end] + "}")
+    return (low, high), end + 1
+
+def tokenize(regex, extended=False, positions=None):
+    # splits regex into a list of (tokenType, value) tokens
+    # '+' and '|' are union, '.' is concatenation, '*' is the star, '?' and
+    # {m,n} are repetitions and symbols are given as their code point
+    # ranges: a character, a class like [a-z_] or an escape like \d or \*
+    # with extended, '+' means one or more repetitions instead of union
+    # the index in regex of every token is appended to positions if given
+    tokens = []
+    i = 0
+    while i < len(regex):
+        if positions is not None:
+            positions.append(i)
+        c = regex[i]
+        if c == '\\':
+            ranges, i = read_escape(regex, i + 1)
+            tokens.append((tokenType.SYMBOL, ranges))
+            continue
+        if c == '[':
+            ranges, i = read_class(regex, i + 1)
+            tokens.append((tokenType.SYMBOL, ranges))
+            continue
+        if c == '{':
+            repeat = read_repeat(regex, i + 1)
+            if repeat is not None:
+                tokens.append((tokenType.REPEAT, repeat[0]))
+                i = repeat[1]
+                continue
+        if c == '(':
+            tokens.append((tokenType.OPEN, c))
+        elif c == ')':
+            tokens.append((tokenType.CLOSE, c))
+        elif c == '|' or (c == '+' and not extended):
+            tokens.append((tokenType.UNION, '+'))
+        elif c == '+':
+            tokens.append((tokenType.REPEAT, (1, None)))
+        elif c == '*':
+            tokens.append((tokenType.STAR, c))
+        elif c == '?':
+            tokens.append((tokenType.REPEAT, (0, 1)))
+        elif c == '.':
+            tokens.append((tokenType.CONCAT, c))
+        else:
+            tokens.append((tokenType.SYMBOL, ((ord(c), ord(c)),)))
+        i += 1
+    return tokens
+
+def check_tokens(regex, tokens, positions):
+    # raises ValueError if the tokens of regex, at the given positions in
+    # it, are not a regex: parentheses must be balanced, groups not empty
+    # and every operator must have its operands
+    if len(tokens) == 0:
+        raise ValueError("empty regex")
+    opened = []
+    operand = False
+    for (kind, value), i in zip(tokens, positions):
+        if kind == tokenType.SYMBOL:
+            operand = True
+        elif kind == tokenType.OPEN:
+            opened.append(i)
+            operand = False
+        elif kind == tokenType.CLOSE:
+            if len(opened) == 0:
+                raise ValueError("unbalanced ')' at position " + str(i))
+            if not operand:
+                raise ValueError("missing operand before ')' at position " +
+                                 str(i))
+            opened.pop()
+        elif kind == tokenType.STAR or kind == tokenType.REPEAT:
+            if not operand:
+                raise ValueError("nothing to repeat at position " + str(i))
+        else:
+            if not operand:
+                raise ValueError("missing operand before " + repr(regex[i]) +
+                                 " at position " + str(i))
+            operand = False
+    if len(opened) > 0:
+        raise ValueError("unbalanced '(' at position " + str(opened[-1]))
+    if not operand:
+        raise ValueError("regex ends with " + repr(regex[positions[-1]]))
+
+def class_text(ranges):
+    # writes ranges in the syntax of a character class, without the brackets
+    text = ''
+    for lo, hi in ranges:
+        for x in (lo, hi) if lo != hi and hi != lo + 1 else range(lo, hi + 1):
+            text += ('\\' if chr(x) in '\\]-^[' else '') + chr(x)
+            if lo != hi and hi != lo + 1 and x == lo:
+                text += '-'
+    return text
+
+def token_text(token):
+    # writes a token back as regex text, that tokenize reads as the same token
+    kind, value = token
+    if kind == tokenType.SYMBOL:
+        if len(value) == 1 and value[0][0] == value[0][1]:
+            c = chr(value[0][0])
+            return '\\' + c if c in special_chars else c
+        return '[' + class_text(value) + ']'
+    if kind == tokenType.REPEAT:
+        low, high = value
+        if high == low:
+            return '{' + str(low) + '}'
+        return '{' + str(low) + ',' + ('' if high is None else str(high)) + '}'
+    return value
+
+def repeat_tree(exp_t, low, high):
+    # returns the tree of exp_t repeated low to high times (any number of
+    # times more than low if high is None), the copies share exp_t
+    parts = [exp_t] * low
+    if high is None:
+        star = ExpressionTree(charType.KLEENE)
+        star.left = exp_t
+        parts.append(star)
+    else:
+        # the optional copies are nested, x{0,2} is (x(x)?)?
+        tail = None
+        for i in range(high - low):
+            z = exp_t
+            if tail is not None:
+                z = ExpressionTree(charType.CONCAT)
+                z.left = exp_t
+                z.right = tail
+            tail = ExpressionTree(charType.UNION)
+            tail.left = z
+            tail.right = ExpressionTree(charType.EMPTY)
+        if tail is not None:
+            parts.append(tail)
+    if len(parts) == 0:
+        return ExpressionTree(charType.EMPTY)
+    tree = parts[0]
+    for part in parts[1:]:
+        z = ExpressionTree(charType.CONCAT)
+        z.left = tree
+        z.right = part
+        tree = z
+    return tree
+
+def make_exp_tree(regexp):
+    # builds the expression tree of a regex in postfix form, given as the
+    # text returned by polish_regex or as a list of tokens
+    # raises ValueError if an operator is missing its operands or the
+    # operands are not all joined into one expression
+    if isinstance(regexp, str):
+        regexp = tokenize(regexp)
+    stack = []
+    for kind, value in regexp:
+        if kind in (tokenType.UNION, tokenType.CONCAT):
+            arity = 2
+        elif kind in (tokenType.STAR, tokenType.REPEAT):
+            arity = 1
+        else:
+            arity = 0
+        if len(stack) < arity:
+            raise ValueError("operator " + repr(token_text((kind, value))) +
+                             " is missing an operand")
+        if kind == tokenType.UNION:
+            z = ExpressionTree(charType.UNION)
+            z.right = stack.pop()
+            z.left = stack.pop()
+            stack.append(z)
+        elif kind == tokenType.CONCAT:
+            z = ExpressionTree(charType.CONCAT)
+            z.right = stack.pop()
+            z.left = stack.pop()
+            stack.append(z)
+        elif kind == tokenType.STAR:
+            z = ExpressionTree(charType.KLEENE)
+            z.left = stack.pop()
+            stack.append(z)
+        elif kind == tokenType.REPEAT:
+            stack.append(repeat_tree(stack.pop(), value[0], value[1]))
+        elif kind == tokenType.OPEN or kind == tokenType.CLOSE:
+            continue
+        else:
+            stack.append(ExpressionTree(charType.SYMBOL, value))
+    if len(stack) != 1:
+        raise ValueError("regex is not one expression")
+    return stack[0]
+
+def compPrecedence(a, b):
+    p = [tokenType.UNION, tokenType.CONCAT]
+    return p.index(a) > p.index(b)
+
+def symbol_classes(trees):
+    # splits the characters used by the symbols of the trees into classes
+    # of characters that are in exactly the same symbols, so a symbol like
+    # [a-z] is one transition on one class instead of 26 transitions
+    # returns the names of the classes, a character or [...] in the syntax
+    # of class_text, and a dictionary of the names of the classes of every
+    # symbol, keyed by its ranges
+    symbols = []
+    seen = set()
+    stack = list(trees)
+    while len(stack) > 0:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node.charType == charType.SYMBOL:
+            symbols.append(node.value)
+        for child in (node.left, node.right):
+            if child is not None:
+                stack.append(child)
+    symbols = list(dict.fromkeys(symbols))
+
+    # the ranges of all symbols cut the code points into intervals,
+    # characters of an interval are in the same symbols
+    points = sorted(set(x for ranges in symbols for lo, hi in ranges
+                        for x in (lo, hi + 1)))
+    index = {x: i for i, x in enumerate(points)}
+    cover = [[] for x in points]
+    for j, ranges in enumerate(symbols):
+        for lo, hi in ranges:
+            for k in range(index[lo], index[hi + 1]):
+                cover[k].append(j)
+
+    # intervals in the same symbols make one class
+    class_ranges = {}
+    for k in range(len(points) - 1):
+        if len(cover[k]) > 0:
+            class_ranges.setdefault(tuple(cover[k]), []).append(
+                (points[k], points[k + 1] - 1))
+    names = []
+    symbol_names = {ranges: [] for ranges in symbols}
+    for key, ranges in class_ranges.items():
+        ranges = merge_ranges(ranges)
+        if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+            name = chr(ranges[0][0])
+        else:
+            name = '[' + class_text(ranges) + ']'
+        names.append(name)
+        for j in key:
+            symbol_names[symbols[j]].append(name)
+    return names, symbol_names
+
+def compute_regex(exp_t, symbol_names=None):
+    # returns E-NFA
+    # the tree is walked in post order with an explicit stack, so regexes
+    # with many thousands of symbols do not hit the recursion limit
+    # transitions are on the classes of symbol_classes, which are found
+    # from exp_t unless given
+    started = instrumentation.start()
+    if symbol_names is None:
+        symbol_names = symbol_classes([exp_t])[1]
+    results = []
+    stack = [(exp_t, False)]
+    while len(stack) > 0:
+        node, children_done = stack.pop()
+        if node.charType == charType.SYMBOL:
+            results.append(eval_symbol(node, symbol_names))
+        elif node.charType == charType.EMPTY:
+            results.append(eval_empty())
+        elif not children_done:
+            stack.append((node, True))
+            if node.right is not None:
+                stack.append((node.right, False))
+            stack.append((node.left, False))
+        elif node.charType == charType.CONCAT:
+            right_nfa = results.pop()
+            results.append(do_concat(results.pop(), right_nfa))
+        elif node.charType == charType.UNION:
+            second_nfa = results.pop()
+            results.append(do_union(results.pop(), second_nfa))
+        else:
+            results.append(do_kleene_star(results.pop()))
+    instrumentation.finish("compute_regex", started)
+    return results[0]
+
+# Largest number of required literals kept for each node of the tree
+MAX_LITERALS = 4
+
+def common_prefix(a, b):
+    i = 0
+    while i < len(a) and i < len(b) and a[i] == b[i]:
+        i += 1
+    return a[:i]
+
+def common_suffix(a, b):
+    return common_prefix(a[::-1], b[::-1])[::-1]
+
+def best_literals(literals):
+    # keeps the longest literals that are not part of a longer one
+    kept = []
+    for literal in sorted(set(literals), key=len, reverse=True):
+        if literal and not any(literal in longer for longer in kept):
+            kept.append(literal)
+            if len(kept) == MAX_LITERALS:
+                break
+    return kept
+
+def literals_concat(left, right):
+    # literals of a node are (exact, prefix, suffix, required): the only
+    # string it matches (None if it matches more than one), the literal
+    # every match starts with, the one every match ends with and the
+    # literals every match contains
+    l_exact, l_prefix, l_suffix, l_required = left
+    r_exact, r_prefix, r_suffix, r_required = right
+    if l_exact is not None and r_exact is not None:
+        exact = l_exact + r_exact
+        return exact, exact, exact, [exact] if exact else []
+    prefix = l_exact + r_prefix if l_exact is not None else l_prefix
+    suffix = l_suffix + r_exact if r_exact is not None else r_suffix
+    # a match of the concatenation contains the end of a match of the
+    # left side followed by the start of a match of the right side
+    required = best_literals(l_required + r_required + [l_suffix + r_prefix])
+    return None, prefix, suffix, required
+
+def literals_union(first, second):
+    if first[0] is not None and first[0] == second[0]:
+        return first
+    prefix = common_prefix(first[1], second[1])
+    suffix = common_suffix(first[2], second[2])
+    required = best_literals([prefix, suffix] +
+                             [x for x in first[3] if x in second[3]])
+    return None, prefix, suffix, required
+
+def extract_literals(exp_t):
+    # returns the literal prefix every match of the expression tree starts
+    # with ('' if there is none) and a list of literals every match
+    # contains, longest first, so a search can skip to the positions where
+    # the prefix occurs and reject texts missing a literal without running
+    # the automaton
+    results = []
+    stack = [(exp_t, False)]
+    while len(stack) > 0:
+        node, children_done = stack.pop()
+        if node.charType == charType.SYMBOL:
+            # only a symbol of one character is a literal
+            ranges = node.value
+            if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+                c = chr(ranges[0][0])
+                results.append((c, c, c, [c]))
+            else:
+                results.append((None, '', '', []))
+        elif node.charType == charType.EMPTY:
+            results.append(('', '', '', []))
+        elif not children_done:
+            stack.append((node, True))
+            if node.right is not None:
+                stack.append((node.right, False))
+            stack.append((node.left, False))
+        elif node.charType == charType.CONCAT:
+            right = results.pop()
+            results.append(literals_concat(results.pop(), right))
+        elif node.charType == charType.UNION:
+            second = results.pop()
+            results.append(literals_union(results.pop(), second))
+        else:
+            # a star matches the empty string, unless it only repeats it
+            exact = '' if results.pop()[0] == '' else None
+            results.append((exact, '', '', []))
+    exact, prefix, suffix, required = results[0]
+    return prefix, required
+
+def eval_symbol(exp_t, symbol_names):
+    # one transition on each class of the characters of the symbol
+    start = NFAState()
+    end = NFAState()
+    for name in symbol_names[exp_t.value]:
+        start.next_state[name] = [end]
+    return start, end
+
+def eval_empty():
+    start = NFAState()
+    end = NFAState()
+    start.next_state[EPSILON] = [end]
+    return start, end
+
+def do_concat(left_nfa, right_nfa):
+    left_nfa[1].next_state[EPSILON] = [right_nfa[0]]
+    return left_nfa[0], right_nfa[1]
+
+def do_union(first_nfa, second_nfa):
+    start = NFAState()
+    end = NFAState()
+    start.next_state[EPSILON] = [first_nfa[0], second_nfa[0]]
+    first_nfa[1].next_state[EPSILON] = [end]
+    second_nfa[1].next_state[EPSILON] = [end]
+    return start, end
+
+def do_kleene_star(starred_nfa):
+    start = NFAState()
+    end = NFAState()
+    start.next_state[EPSILON] = [starred_nfa[0], end]
+    starred_nfa[1].next_state[EPSILON] = [starred_nfa[0], end]
+    return start, end
+
+def arrange_transitions(state, states_done, symbol_table, nfa):
+    # numbers the states in depth first order from state, states are
+    # numbered when their parent is visited and visited in order
+    stack = [state]
+    next_num = max(symbol_table.values()) + 1
+    while len(stack) > 0:
+        state = stack.pop()
+        if state in states_done:
+            continue
+        states_done.add(state)
+        successors = []
+        for symbol in list(state.next_state):
+            if symbol not in nfa['letters']:
+                nfa['letters'].append(symbol)
+            for ns in state.next_state[symbol]:
+                if ns not in symbol_table:
+                    symbol_table[ns] = next_num
+                    next_num += 1
+                    q_state = "q" + str(symbol_table[ns])  # Change state to lowercase
+                    nfa['states'].append(q_state)
+                nfa['transition_function'].append(["q" + str(symbol_table[state]), symbol, "q" + str(symbol_table[ns])])
+            successors += state.next_state[symbol]
+        stack.extend(reversed(successors))
+
+def arrange_nfa(fa, final_tags=None):
+    # returns the states, letters and transitions of the E-NFA as a dict
+    # the start state is the start of fa and the final states its end,
+    # or the list of ends of the regexes of a set given with final_tags
+    started = instrumentation.start()
+    nfa = {}
+    nfa['states'] = []
+    nfa['letters'] = []
+    nfa['transition_function'] = []
+    nfa['start_states'] = []
+    nfa['final_states'] = []
+    q_1 = "q" + str(1)  # Change state to lowercase
+    nfa['states'].append(q_1)
+    symbol_table = {fa[0] : 1}
+    arrange_transitions(fa[0], set(), symbol_table, nfa)
+    nfa["start_states"].append("q" + str(symbol_table[fa[0]]))  # Change state to lowercase
+    if final_tags is None:
+        nfa["final_states"].append("q" + str(symbol_table[fa[1]]))
+    else:
+        nfa["final_states"] = ["q" + str(symbol_table[end]) for end in fa[1]]
+        nfa["final_tags"] = list(final_tags)
+    instrumentation.finish("arrange_nfa", started,
+                           nfa_states=len(nfa['states']),
+                           nfa_transitions=len(nfa['transition_function']))
+    return nfa
+
+def add_concat(tokens):
+    # puts a concatenation between two tokens next to each other without
+    # an operator, after a symbol, ')' or repetition and before a symbol or '('
+    res = []
+    for i in range(len(tokens)):
+        if i > 0 and tokens[i - 1][0] in (tokenType.SYMBOL, tokenType.CLOSE,
+                                          tokenType.STAR, tokenType.REPEAT) \
+                and tokens[i][0] in (tokenType.SYMBOL, tokenType.OPEN):
+            res.append((tokenType.CONCAT, '.'))
+        res.append(tokens[i])
+    return res
+
+def compute_postfix(tokens):
+    stk = []
+    res = []
+    for token in tokens:
+        kind = token[0]
+        if kind in (tokenType.SYMBOL, tokenType.STAR, tokenType.REPEAT):
+            res.append(token)
+        elif kind == tokenType.CLOSE:
+            while len(stk) > 0 and stk[-1][0] != tokenType.OPEN:
+                res.append(stk.pop())
+            stk.pop()
+        elif kind == tokenType.OPEN:
+            stk.append(token)
+        elif len(stk) == 0 or stk[-1][0] == tokenType.OPEN or compPrecedence(kind, stk[-1][0]):
+            stk.append(token)
+        else:
+            while len(stk) > 0 and stk[-1][0] != tokenType.OPEN and not compPrecedence(kind, stk[-1][0]):
+                res.append(stk.pop())
+            stk.append(token)
+    while len(stk) > 0:
+        res.append(stk.pop())
+    return res
+
+def polish_regex(regex, extended=False):
+    # returns the regex in postfix form as text, in which every symbol and
+    # operator is written the same way however it was written in regex
+    # raises ValueError if regex is not a valid regex, see check_tokens
+    positions = []
+    tokens = tokenize(regex, extended, positions)
+    check_tokens(regex, tokens, positions)
+    reg = add_concat(tokens)
+    regg = compute_postfix(reg)
+    return ''.join(token_text(token) for token in regg)
+
+def add_state(state, states, marks, generation):
+    # adds state and every state reachable from it on epsilon to states,
+    # marks[state] == generation means it was already added in this step
+    stack = [state]
+    while len(stack) > 0:
+        st = stack.pop()
+        if marks.get(st) == generation:
+            continue
+        marks[st] = generation
+        states.append(st)
+        stack.extend(st.next_state.get(EPSILON, ()))
+
+def simulate_nfa(fa, text, pos=0, classes=None, names=None):
+    # runs the E-NFA from compute_regex on text starting at pos, stepping
+    # the current and next lists of states one character at a time
+    # classes maps each character to the index of the name of its symbol
+    # class in names, like symbolClasses, without it the characters are
+    # the symbols
+    # returns the end of the longest match, -1 if nothing matches
+    start, accept = fa
+    marks = {}
+    generation = 0
+    current = []
+    add_state(start, current, marks, generation)
+    end = pos if marks.get(accept) == generation else -1
+    for i in range(pos, len(text)):
+        c = text[i]
+        if classes is not None:
+            c = classes.get(c)
+            if c is not None:
+                c = names[c]
+        generation += 1
+        following = []
+        for st in current:
+            for ns in st.next_state.get(c, ()):
+                add_state(ns, following, marks, generation)
+        current = following
+        if len(current) == 0:
+            break
+        if marks.get(accept) == generation:
+            end = i + 1
+    if instrumentation.active is not None:
+        instrumentation.count("nfa_simulations")
+        if len(current) == 0:
+            instrumentation.count("nfa_dead_ends")
+    return end
+
+def match(regex, text, pos=0, extended=False):
+    # matches text against regex without building the DFA
+    exp_t = make_exp_tree(polish_regex(regex, extended))
+    names, symbol_names = symbol_classes([exp_t])
+    fa = compute_regex(exp_t, symbol_names)
+    return simulate_nfa(fa, text, pos, symbolClasses(names), names)
+
+def fullmatch(regex, text, extended=False):
+    return match(regex, text, 0, extended) == len(text)
+
+def load_regex():
+    import json
+    with open(sys.argv[1], 'r') as inpjson:
+        regex = json.loads(inpjson.read())
+    return regex
+
+def draw_nfa_graph(nfa, max_states=MAX_DRAW_STATES, sample=False):
+    # draws the nfa dict to nfa_graph.png, graphviz is only imported here
+    # more than max_states states are refused, or with sample only the
+    # states closest to the start are drawn
+    edges = {}
+    for transition in nfa['transition_function']:
+        edges.setdefault(transition[0], []).append(transition)
+    order = sampleStates(len(nfa['states']), nfa["start_states"][0],
+                         lambda st: [t[2] for t in edges.get(st, ())],
+                         max_states, sample)
+    drawn = set(order)
+    dot = newDigraph()
+    dot.attr(rankdir='LR')
+    dot.node('start', shape='point')
+    dot.edge('start', nfa["start_states"][0])
+    for st in order:
+        for transition in edges.get(st, ()):
+            to_state = transition[2] if transition[2] in drawn else '…'
+            dot.edge(transition[0], to_state, label=transition[1])
+    for state in nfa["final_states"]:
+        if state in drawn:
+            dot.node(state, shape='doublecircle')
+    dot.render('nfa_graph', format='png', cleanup=True)
+
+
+def nfa_to_dict(nfa):
+    states = nfa['states']
+    transition_function = nfa['transition_function']
+    start_states = nfa['start_states']
+    final_states = nfa['final_states']
+    letters = nfa['letters']
+
+    # Convert states to lowercase
+    states = [state.lower() for state in states]
+    start_states = [state.lower() for state in start_states]
+    final_states = [state.lower() for state in final_states]
+    transition_function = [[s[0].lower(), s[1], s[2].lower()] for s in transition_function]
+
+    # Construct the dictionary
+    nfa_dict = {
+        "no_state": len(states),
+        "states": states,
+        "no_alphabet": len(letters),
+        "alphabets": letters,
+        "start": start_states[0],
+        "no_final": len(final_states),
+        "finals": final_states,
+        "no_transition": len(transition_function),
+        "transitions": transition_function,
+        "epsilon": EPSILON
+    }
+
+    # Index of the regex of each final state of a set of regexes
+    if 'final_tags' in nfa:
+        nfa_dict["final_tags"] = nfa['final_tags']
+
+    return nfa_dict
+
+def output_nfa_to_json(nfa, filename):
+    # Write the dictionary to a JSON file, nfa is the dict from arrange_nfa
+    # or an NFA object
+    import json
+    if isinstance(nfa, NFA):
+        nfa_dict = nfa.toDict()
+    else:
+        nfa_dict = nfa_to_dict(nfa)
+    with open(filename, 'w') as json_file:
+        json.dump(nfa_dict, json_file, indent=2)
+
+def compile(regex, extended=False):
+    # compiles regex to an NFA object without touching any shared state,
+    # so it can be called from many threads at once
+    # the NFA has its epsilon transitions removed, see NFA.removeEpsilon
+    return compile_postfix(polish_regex(regex, extended))
+
+def compile_postfix(postfix):
+    # same as compile, for a regex already in the form given by polish_regex
+    exp_t = make_exp_tree(postfix)
+    fa = compute_regex(exp_t)
+    nfa = NFA.fromDict(nfa_to_dict(arrange_nfa(fa)))
+    nfa.prefix, nfa.required = extract_literals(exp_t)
+    return nfa.removeEpsilon()
+
+def compile_set(regexes, extended=False):
+    # compiles many regexes to one NFA, a new start state has an epsilon
+    # transition to the start of each of them and the final state of
+    # regex i is tagged with i, so the DFA can tell which ones matched
+    # the symbol classes are shared by all the regexes
+    trees = [make_exp_tree(polish_regex(regex, extended)) for regex in regexes]
+    symbol_names = symbol_classes(trees)[1]
+    start = NFAState()
+    start.next_state[EPSILON] = []
+    ends = []
+    for exp_t in trees:
+        fa = compute_regex(exp_t, symbol_names)
+        start.next_state[EPSILON].append(fa[0])
+        ends.append(fa[1])
+    nfa = arrange_nfa((start, ends), range(len(ends)))
+    return NFA.fromDict(nfa_to_dict(nfa)).removeEpsilon()
+
+
+def load_regex_from_input():
+    regex = input("Enter RE:")
+    return {"regex": regex}
+
+def main():
+    r = load_regex_from_input()
+    reg = r['regex']
+    
+    pr = polish_regex(reg)
+    et = make_exp_tree(pr)
+    fa = compute_regex(et)
+    nfa = arrange_nfa(fa)
+
+    # the epsilon free NFA is written unless --keep-epsilon is given,
+    # which writes the NFA of Thompson's construction as it is
+    if "--keep-epsilon" not in sys.argv:
+        nfa = NFA.fromDict(nfa_to_dict(nfa)).removeEpsilon()
+    
+    output_filename = "output.json"
+    
+    output_nfa_to_json(nfa, output_filename)
+
+
+if __name__ == "__main__":
+    main()
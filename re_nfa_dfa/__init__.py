@@ -0,0 +1,62 @@
+# Library interface of the RE -> ε-NFA -> DFA pipeline
+#
+#     nfa = compile("(a+b)*abb")
+#     dfa = minimize(determinize(nfa))
+#     dfa.fullmatch("babb")
+#     match("(a+b)*abb", "aabbx")  # -> 4
+#
+# Importing the package only defines names, nothing is read, printed or
+# drawn, and the optional dependencies (graphviz for drawing, numpy for
+# batch_match) are imported only by the functions that need them
+#
+# Timings and counters of every stage are collected after
+# instrumentation.enable(), see instrumentation.Stats
+
+from . import instrumentation
+from .NFA_to_DFA_main import DFA, NFA, LazyDFA, StreamMatcher, determinize
+from .Re_to_NFA_main import compile, compile_set
+
+__all__ = ['DFA', 'NFA', 'LazyDFA', 'StreamMatcher', 'compile',
+           'compile_set', 'determinize', 'minimize', 'match', 'fullmatch',
+           'search', 'instrumentation']
+
+# Cache of the DFAs of the regexes given as strings to match, fullmatch
+# and search, made on first use
+_cache = None
+
+
+def minimize(dfa):
+    # returns the minimal DFA equivalent to dfa
+    return dfa.minimize()[0]
+
+
+def _automaton(pattern, extended):
+    # returns the DFA of pattern, which is a regex or an already built
+    # DFA or LazyDFA
+    global _cache
+    if not isinstance(pattern, str):
+        return pattern
+    if _cache is None:
+        from .automaton_cache import AutomatonCache
+        _cache = AutomatonCache()
+    return _cache.get(pattern, extended)
+
+
+# extended selects the syntax in which '|' is union and '+' is one or
+# more repetitions, see Re_to_NFA_main.tokenize
+
+def match(pattern, text, pos=0, extended=False):
+    # returns the end of the longest match of pattern starting at pos,
+    # -1 if no prefix of text[pos:] matches
+    return _automaton(pattern, extended).match(text, pos)
+
+
+def fullmatch(pattern, text, extended=False):
+    # returns True if the whole text matches pattern
+    return _automaton(pattern, extended).fullmatch(text)
+
+
+def search(pattern, text, pos=0, extended=False):
+    # returns the leftmost longest match of pattern in text as a
+    # (start, end) pair, None if there is no match
+    return _automaton(pattern, extended).search(text, pos)
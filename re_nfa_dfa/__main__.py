@@ -0,0 +1,81 @@
+# Command line interface, run as
+#
+#     python -m re_nfa_dfa REGEX [TEXT ...]
+#
+# Without texts it prints the minimal DFA of REGEX, otherwise whether each
+# text matches. The exit status is 0 if every text matched, like grep
+import argparse
+import sys
+
+import re_nfa_dfa
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='re_nfa_dfa',
+        description="Compile a regular expression to a minimal DFA and "
+                    "match texts against it.")
+    parser.add_argument('regex')
+    parser.add_argument('texts', nargs='*', metavar='text')
+    parser.add_argument('-E', '--extended', action='store_true',
+                        help="read '|' as union and '+' as one or more "
+                             "repetitions")
+    parser.add_argument('--search', action='store_true',
+                        help="find a match anywhere in the text instead of "
+                             "matching the whole text")
+    parser.add_argument('--save', metavar='FILE',
+                        help="write the DFA to FILE in the binary format")
+    parser.add_argument('--draw', metavar='FILE',
+                        help="render the DFA diagram to FILE.pdf "
+                             "(needs graphviz)")
+    parser.add_argument('--stats', metavar='FILE',
+                        help="write the timings and counters of every stage "
+                             "to FILE, in the Prometheus text format if it "
+                             "ends with .prom and as JSON otherwise")
+    args = parser.parse_args(argv)
+    if args.stats:
+        re_nfa_dfa.instrumentation.enable()
+
+    try:
+        nfa = re_nfa_dfa.compile(args.regex, args.extended)
+    except ValueError as error:
+        parser.error(str(error))
+    dfa = re_nfa_dfa.minimize(re_nfa_dfa.determinize(nfa))
+    if args.save:
+        dfa.save(args.save)
+    if args.draw:
+        dfa.draw(args.draw, sample=True)
+    if len(args.texts) == 0:
+        print(repr(dfa))
+        write_stats(args.stats)
+        return 0
+
+    status = 0
+    for text in args.texts:
+        if args.search:
+            found = dfa.search(text)
+            result = "no match" if found is None else \
+                "match at {}:{}".format(*found)
+        else:
+            found = dfa.fullmatch(text)
+            result = "match" if found else "no match"
+        if not found:
+            status = 1
+        print("{}: {}".format(text, result))
+    write_stats(args.stats)
+    return status
+
+
+def write_stats(filename):
+    stats = re_nfa_dfa.instrumentation.disable()
+    if filename is None or stats is None:
+        return
+    with open(filename, 'w') as file:
+        if filename.endswith('.prom'):
+            stats.writePrometheus(file)
+        else:
+            stats.writeJSON(file)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
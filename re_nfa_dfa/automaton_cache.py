@@ -0,0 +1,96 @@
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+
+from . import instrumentation
+from .NFA_to_DFA_main import DFA, determinize
+from .Re_to_NFA_main import (compile_postfix, extract_literals, make_exp_tree,
+                             polish_regex)
+
+# Version of the files written to the on-disk store, it is part of the
+# file names so files written with another version are compiled again
+CACHE_VERSION = 3
+
+
+class AutomatonCache:
+    # Cache of minimal DFAs keyed by the postfix form of their regex, so
+    # that spellings like "(a)b" and "ab" share one entry. At most max_size
+    # DFAs are kept in memory, least recently used first out. If directory
+    # is given, compiled DFAs are also saved there in the binary format of
+    # DFA.save and memory-mapped back by later processes
+    def __init__(self, max_size=1024, directory=None):
+        self.max_size = max_size
+        self.directory = directory
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, regex, extended=False):
+        # Method to get the minimal DFA of regex, compiling it on a miss
+        # extended is the syntax of regex, see tokenize
+        key = polish_regex(regex, extended)
+        with self.lock:
+            dfa = self.entries.get(key)
+            if dfa is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                instrumentation.count("automaton_cache_hits")
+                return dfa
+            self.misses += 1
+        instrumentation.count("automaton_cache_misses")
+
+        dfa = self.load(key)
+        if dfa is None:
+            dfa = determinize(compile_postfix(key)).minimize()[0]
+            self.store(key, dfa)
+
+        with self.lock:
+            self.entries[key] = dfa
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return dfa
+
+    def path(self, key):
+        # Method to get the file of a key in the on-disk store
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory,
+                            name + ".v" + str(CACHE_VERSION) + ".dfa")
+
+    def load(self, key):
+        # Method to read a DFA from the on-disk store, returns None if it
+        # is missing or unreadable
+        if self.directory is None:
+            return None
+        try:
+            dfa = DFA.load(self.path(key))
+        except (OSError, ValueError):
+            return None
+        # The binary format has no literals, they are found again from the key
+        dfa.prefix, dfa.required = extract_literals(make_exp_tree(key))
+        return dfa
+
+    def store(self, key, dfa):
+        # Method to write a DFA to the on-disk store, the file is written
+        # under a temporary name and renamed, so concurrent writers and
+        # readers never see a partly written file
+        if self.directory is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(dfa.toBytes())
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        # Method to empty the in-memory cache, the on-disk store is kept
+        with self.lock:
+            self.entries.clear()
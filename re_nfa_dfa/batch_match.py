@@ -0,0 +1,82 @@
+import numpy as np
+
+from .NFA_to_DFA_main import RangeClasses
+
+
+def class_table(dfa, size=256):
+    # returns the symbol class of every code point below size as an array,
+    # code points outside the alphabet get the class dfa.other; classes
+    # are stored in the smallest integer type that holds them
+    dtype = np.uint8 if dfa.width <= 256 else np.int32
+    lookup = np.full(size, dfa.other, dtype=dtype)
+    for key, cls in dfa.classes.items():
+        if isinstance(key, int) and key < size:
+            lookup[key] = cls
+    if isinstance(dfa.classes, RangeClasses):
+        classes = dfa.classes
+        for first, last, cls in zip(classes.starts, classes.ends,
+                                    classes.indexes):
+            if first < size:
+                lookup[first:min(last + 1, size)] = cls
+    return lookup
+
+
+def encode_batch(dfa, texts):
+    # encodes a list of str or bytes into a matrix of symbol classes,
+    # one row per text padded to the longest one, and the text lengths
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64,
+                          count=len(texts))
+    if len(texts) == 0:
+        return class_table(dfa, 0).reshape(0, 0), lengths
+
+    # numpy pads the texts to a fixed width array of code points (UCS-4
+    # for str, bytes for bytes), which is viewed as a matrix of integers
+    width = max(int(lengths.max()), 1)
+    if isinstance(texts[0], str):
+        points = np.asarray(texts, dtype='U' + str(width)).view(np.uint32)
+    else:
+        points = np.asarray(texts, dtype='S' + str(width)).view(np.uint8)
+    points = points.reshape(len(texts), width)
+    lookup = class_table(dfa, int(points.max()) + 1)
+    return lookup[points], lengths
+
+
+def fullmatch_batch(dfa, texts):
+    # checks every text against the DFA at once, all rows are stepped
+    # together with one gather from the transition table per column
+    # returns a boolean array, True where the whole text is accepted
+    codes, lengths = encode_batch(dfa, texts)
+    table = np.frombuffer(memoryview(dfa.table).cast('B'), dtype=np.int32)
+    finals = np.frombuffer(bytes(dfa.finals), dtype=np.uint8).astype(bool)
+
+    # rows are sorted by length, longest first, so the rows that are still
+    # being read are always a prefix (lengths are kept negated to be in
+    # ascending order for searchsorted); columns are made contiguous
+    rows = np.argsort(-lengths, kind='stable')
+    lengths = -lengths[rows]
+    codes = np.ascontiguousarray(codes[rows].T)
+    state = np.full(len(texts), dfa.start, dtype=np.int64)
+    first = 0
+
+    for column in range(codes.shape[0]):
+        count = int(np.searchsorted(lengths, -column, side='left'))
+        if count == 0:
+            break
+        current = state[:count]
+        state[:count] = table[current * dfa.width +
+                              codes[column - first, :count]]
+
+        # once half of the rows reached the dead state ϕ they are
+        # dropped, along with the columns already read
+        if column % 8 == 7:
+            alive = state != dfa.DEAD
+            if np.count_nonzero(alive) * 2 < len(state):
+                rows = rows[alive]
+                lengths = lengths[alive]
+                state = state[alive]
+                codes = np.ascontiguousarray(codes[column + 1 - first:, alive])
+                first = column + 1
+
+    accepted = np.zeros(len(texts), dtype=bool)
+    accepted[rows] = finals[state]
+    return accepted
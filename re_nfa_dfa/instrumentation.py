@@ -0,0 +1,135 @@
+import threading
+import time
+
+# Stats collecting the measurements of the pipeline, None when disabled.
+# Instrumented code only checks this once per call (never per character),
+# so leaving it disabled costs next to nothing
+active = None
+
+
+class Stats:
+    # Wall time and number of runs of every stage of the pipeline, counters
+    # summed over all runs (states, transitions, closure sizes, dead state
+    # hits, cache hits and misses) and the largest value seen of some of
+    # them. callback, if given, is called as callback(stage, seconds,
+    # counters) at the end of every stage
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.seconds = dict()
+        self.calls = dict()
+        self.counters = dict()
+        self.maxima = dict()
+        self.lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def maximum(self, name, value):
+        with self.lock:
+            if value > self.maxima.get(name, value - 1):
+                self.maxima[name] = value
+
+    def record(self, stage, seconds, counters):
+        # Method to add a finished run of a stage and its counters
+        with self.lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+        if self.callback is not None:
+            self.callback(stage, seconds, counters)
+
+    def reset(self):
+        with self.lock:
+            self.seconds.clear()
+            self.calls.clear()
+            self.counters.clear()
+            self.maxima.clear()
+
+    def toDict(self):
+        # Method to get every measurement as a flat dictionary, stages give
+        # <stage>_seconds and <stage>_calls, maxima give <name>_max
+        with self.lock:
+            flat = dict()
+            for stage in sorted(self.seconds):
+                flat[stage + "_seconds"] = self.seconds[stage]
+                flat[stage + "_calls"] = self.calls[stage]
+            for name in sorted(self.counters):
+                flat[name] = self.counters[name]
+            for name in sorted(self.maxima):
+                flat[name + "_max"] = self.maxima[name]
+            return flat
+
+    def writeJSON(self, file):
+        # Method to write the flat dictionary of toDict as JSON
+        import json
+        json.dump(self.toDict(), file, indent=2)
+        file.write("\n")
+
+    def writePrometheus(self, file, prefix="re_nfa_dfa_"):
+        # Method to write the measurements in the Prometheus text format
+        with self.lock:
+            lines = list()
+            lines.append("# TYPE " + prefix + "stage_seconds_total counter")
+            for stage in sorted(self.seconds):
+                lines.append('{}stage_seconds_total{{stage="{}"}} {!r}'.format(
+                    prefix, stage, self.seconds[stage]))
+            lines.append("# TYPE " + prefix + "stage_calls_total counter")
+            for stage in sorted(self.calls):
+                lines.append('{}stage_calls_total{{stage="{}"}} {}'.format(
+                    prefix, stage, self.calls[stage]))
+            for name in sorted(self.counters):
+                lines.append("# TYPE {}{}_total counter".format(prefix, name))
+                lines.append("{}{}_total {}".format(prefix, name,
+                                                    self.counters[name]))
+            for name in sorted(self.maxima):
+                lines.append("# TYPE {}{}_max gauge".format(prefix, name))
+                lines.append("{}{}_max {}".format(prefix, name,
+                                                  self.maxima[name]))
+        file.write("\n".join(lines) + "\n")
+
+
+def enable(stats=None):
+    # starts collecting measurements in stats (a new Stats by default)
+    # and returns it
+    global active
+    active = stats if stats is not None else Stats()
+    return active
+
+
+def disable():
+    # stops collecting measurements, returns the Stats they were put in
+    global active
+    stats = active
+    active = None
+    return stats
+
+
+def start():
+    # returns the start time of a stage, None when disabled
+    if active is None:
+        return None
+    return time.perf_counter()
+
+
+def finish(stage, started, **counters):
+    # records a stage begun when start returned started, with its counters
+    stats = active
+    if started is None or stats is None:
+        return
+    stats.record(stage, time.perf_counter() - started, counters)
+
+
+def count(name, value=1):
+    # adds value to a counter, when enabled
+    stats = active
+    if stats is not None:
+        stats.count(name, value)
+
+
+def maximum(name, value):
+    # keeps the largest value of name, when enabled
+    stats = active
+    if stats is not None:
+        stats.maximum(name, value)
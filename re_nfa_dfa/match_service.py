@@ -0,0 +1,420 @@
+# Local match service, run as
+#
+#     python -m re_nfa_dfa.match_service [--socket PATH | --port N]
+#                                        [--window MS]
+#
+# Other processes compile and match regexes through it instead of running
+# Re_to_NFA_main.py and NFA_to_DFA_main.py and reading output.json. Requests
+# and replies are JSON objects, one per line:
+#
+#     {"id": 1, "op": "compile", "regex": "(a+b)*abb"}
+#     {"id": 2, "op": "fullmatch", "regex": "(a+b)*abb", "text": "babb"}
+#     {"id": 1, "result": {"states": 5, "symbols": ["a", "b"]}}
+#     {"id": 2, "result": true}
+#
+# "op" is compile, match, fullmatch or search, "extended" selects the
+# syntax of the regex (see Re_to_NFA_main.tokenize) and a failed request
+# gets {"id": ..., "error": message}. Replies to the requests of one
+# connection can come back in any order, they carry the id of the request
+import argparse
+import asyncio
+import collections
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import instrumentation
+from .automaton_cache import AutomatonCache
+from .Re_to_NFA_main import polish_regex
+
+# Methods of DFA that can be run by a request
+METHODS = ('match', 'fullmatch', 'search')
+
+# Longest request or reply line in bytes, asyncio streams default to 64 KiB
+LINE_LIMIT = 64 * 1024 * 1024
+
+# Registry of compiled DFAs of the worker, shared by the threads of a
+# thread pool and kept per process in a process pool
+_registry = None
+
+
+def _init_worker(directory, max_size):
+    # makes the registry of the worker, DFAs compiled by any worker are
+    # saved in directory and memory-mapped by the others
+    global _registry
+    if _registry is None or _registry.directory != directory or \
+            _registry.max_size != max_size:
+        _registry = AutomatonCache(max_size, directory)
+
+
+def _compile(regex, extended):
+    dfa = _registry.get(regex, extended)
+    return {"states": dfa.no_state, "symbols": list(dfa.symbols)}
+
+
+def _match_batch(regex, extended, method, texts):
+    # returns the result for every text, or the exception it raised, so a
+    # bad text only fails its own request
+    run = getattr(_registry.get(regex, extended), method)
+    results = list()
+    for text in texts:
+        try:
+            results.append(run(text))
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+async def _read_line(reader):
+    # returns the next line of reader, or b"" at its end. A line longer
+    # than LINE_LIMIT is dropped whole, up to its newline, and raises
+    # ValueError
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    try:
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                break
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+    except asyncio.IncompleteReadError:
+        return b""
+    raise ValueError("line is longer than {} bytes".format(LINE_LIMIT))
+
+
+class MatchService:
+    # Compiles regexes and matches texts on a pool of workers, for the
+    # requests of many concurrent callers. Concurrent compiles of the same
+    # regex (same postfix form) run once and are awaited by every caller.
+    # Match requests for the same regex and method are held for window
+    # seconds, or until max_batch of them are waiting, and handed to a
+    # worker as one batch. With processes the workers are processes that
+    # share the compiled DFAs through the on-disk store of AutomatonCache
+    # in directory (a temporary one by default), otherwise they are
+    # threads sharing one AutomatonCache. The service and every worker
+    # keep at most max_size compiled regexes, least recently used first out
+    def __init__(self, workers=None, window=0.002, max_batch=256,
+                 processes=True, directory=None, max_size=1024):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_size = max_size
+        self.temporary = None
+        if processes and directory is None:
+            directory = self.temporary = tempfile.mkdtemp(prefix="re_nfa_dfa_")
+        self.directory = directory
+        workers = workers or os.cpu_count() or 1
+        if processes:
+            # Workers are started on demand, so forked ones would inherit the
+            # sockets of the connections open at that time and keep them
+            # open after the service closes them, spawned ones inherit none
+            self.pool = ProcessPoolExecutor(
+                workers, multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(directory, max_size))
+        else:
+            self.pool = ThreadPoolExecutor(
+                workers, initializer=_init_worker,
+                initargs=(directory, max_size))
+
+        # Postfix forms of the compiled regexes and their compile results,
+        # the compiles running now, and the batches waiting to be run,
+        # keyed by (postfix form, method)
+        self.compiled = collections.OrderedDict()
+        self.compiling = dict()
+        self.batches = dict()
+
+    async def compile(self, regex, extended=False):
+        # Method to compile regex once, returns the number of states and the
+        # symbols of its minimal DFA
+        key = polish_regex(regex, extended)
+        info = self.compiled.get(key)
+        if info is not None:
+            self.compiled.move_to_end(key)
+            return info
+        task = self.compiling.get(key)
+        if task is None:
+            instrumentation.count("service_compiles")
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(self.pool, _compile, regex, extended)
+            self.compiling[key] = task
+
+            def done(task):
+                del self.compiling[key]
+                if not task.cancelled() and task.exception() is None:
+                    self.compiled[key] = task.result()
+                    while len(self.compiled) > self.max_size:
+                        self.compiled.popitem(last=False)
+
+            task.add_done_callback(done)
+
+        # A caller that gives up does not cancel the compile of the others
+        return await asyncio.shield(task)
+
+    async def run(self, method, regex, text, extended=False):
+        # Method to run the DFA method on text, batched with the other
+        # requests for the same regex and method
+        if method not in METHODS:
+            raise ValueError("unknown method " + repr(method))
+        await self.compile(regex, extended)
+        instrumentation.count("service_requests")
+        loop = asyncio.get_running_loop()
+        batch_key = (polish_regex(regex, extended), method)
+        batch = self.batches.get(batch_key)
+        if batch is None:
+            batch = {"regex": regex, "extended": extended, "texts": list(),
+                     "futures": list()}
+            batch["timer"] = loop.call_later(self.window, self.flush, batch_key)
+            self.batches[batch_key] = batch
+        future = loop.create_future()
+        batch["texts"].append(text)
+        batch["futures"].append(future)
+        if len(batch["texts"]) >= self.max_batch:
+            self.flush(batch_key)
+        return await future
+
+    def flush(self, batch_key):
+        # Method to hand the waiting batch of batch_key to a worker, the
+        # result of every request is set when the batch is done
+        batch = self.batches.pop(batch_key, None)
+        if batch is None:
+            return
+        batch["timer"].cancel()
+        futures = batch["futures"]
+        instrumentation.count("service_batches")
+        instrumentation.maximum("service_batch_size", len(futures))
+        task = asyncio.get_running_loop().run_in_executor(
+            self.pool, _match_batch, batch["regex"], batch["extended"],
+            batch_key[1], batch["texts"])
+
+        def done(task):
+            error = None if task.cancelled() else task.exception()
+            for i, future in enumerate(futures):
+                if future.done():
+                    continue
+                if task.cancelled():
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                elif isinstance(task.result()[i], Exception):
+                    future.set_exception(task.result()[i])
+                else:
+                    future.set_result(task.result()[i])
+
+        task.add_done_callback(done)
+
+    async def handle(self, request):
+        # Method to answer one request object with a reply object
+        reply = {"id": request.get("id")}
+        try:
+            op = request.get("op")
+            extended = bool(request.get("extended", False))
+            if op == "compile":
+                reply["result"] = await self.compile(request["regex"], extended)
+            elif op in METHODS:
+                text = request["text"]
+                if not isinstance(text, str):
+                    raise TypeError("text must be a string")
+                reply["result"] = await self.run(op, request["regex"], text,
+                                                 extended)
+            else:
+                raise ValueError("unknown op " + repr(op))
+        except KeyError as error:
+            reply["error"] = "missing " + str(error)
+        except Exception as error:
+            # Every request gets a reply, or its caller would wait forever
+            reply["error"] = str(error) or type(error).__name__
+        return reply
+
+    async def serve_connection(self, reader, writer):
+        # Method to answer the requests of a connection, each one in its own
+        # task so that requests sent without waiting can share batches
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request is not an object")
+            except ValueError as error:
+                reply = {"id": None, "error": "bad request: " + str(error)}
+            else:
+                reply = await self.handle(request)
+            async with lock:
+                writer.write(json.dumps(reply).encode('utf-8') + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await _read_line(reader)
+                except ValueError as error:
+                    line = json.dumps({"id": None,
+                                       "error": "bad request: " + str(error)})
+                    async with lock:
+                        writer.write(line.encode('utf-8') + b"\n")
+                        await writer.drain()
+                    continue
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if len(tasks) > 0:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        # Method to start listening on the Unix socket path, or on TCP host
+        # and port, returns the asyncio server
+        if path is not None:
+            return await asyncio.start_unix_server(
+                self.serve_connection, path=path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.serve_connection, host, port,
+                                          limit=LINE_LIMIT)
+
+    def close(self):
+        # Method to stop the workers and remove the temporary store
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.temporary is not None:
+            shutil.rmtree(self.temporary, ignore_errors=True)
+
+
+class MatchClient:
+    # Client of a MatchService, made by connect. Requests can be sent from
+    # many tasks at once over the one connection
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.pending = dict()
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    async def receive(self):
+        # Method to read the replies and give each one to its request
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self.pending.pop(reply.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in reply:
+                    future.set_exception(ValueError(reply["error"]))
+                else:
+                    future.set_result(reply["result"])
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+            self.pending.clear()
+
+    async def request(self, op, **fields):
+        # Method to send a request and wait for its result, an error reply
+        # raises ValueError
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        fields.update(id=self.next_id, op=op)
+        line = json.dumps(fields).encode('utf-8') + b"\n"
+        if len(line) > LINE_LIMIT:
+            # The service could not tell which request it refuses
+            del self.pending[self.next_id]
+            raise ValueError("request is longer than LINE_LIMIT")
+        self.writer.write(line)
+        await self.writer.drain()
+        return await future
+
+    async def compile(self, regex, extended=False):
+        return await self.request("compile", regex=regex, extended=extended)
+
+    async def match(self, regex, text, extended=False):
+        return await self.request("match", regex=regex, text=text,
+                                  extended=extended)
+
+    async def fullmatch(self, regex, text, extended=False):
+        return await self.request("fullmatch", regex=regex, text=text,
+                                  extended=extended)
+
+    async def search(self, regex, text, extended=False):
+        result = await self.request("search", regex=regex, text=text,
+                                    extended=extended)
+        return None if result is None else tuple(result)
+
+    async def close(self):
+        self.writer.close()
+        await self.receiver
+
+
+async def connect(path=None, host='127.0.0.1', port=None):
+    # returns a MatchClient connected to the service on the Unix socket
+    # path, or on TCP host and port
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(
+            path, limit=LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port,
+                                                       limit=LINE_LIMIT)
+    return MatchClient(reader, writer)
+
+
+async def serve(args):
+    service = MatchService(args.workers, args.window / 1000.0, args.max_batch,
+                           not args.threads, args.cache, args.max_size)
+    try:
+        server = await service.start(args.socket, args.host, args.port)
+        for sock in server.sockets:
+            print("listening on", sock.getsockname(), flush=True)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='re_nfa_dfa.match_service',
+        description="Serve compile and match requests for regexes over a "
+                    "local socket.")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int,
+                        help="number of workers (default: one per CPU)")
+    parser.add_argument('--threads', action='store_true',
+                        help="use worker threads instead of processes")
+    parser.add_argument('--window', type=float, default=2.0, metavar='MS',
+                        help="milliseconds match requests wait to be "
+                             "batched (default: 2)")
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help="largest batch of match requests (default: 256)")
+    parser.add_argument('--cache', metavar='DIR',
+                        help="keep the compiled DFAs in DIR (default: a "
+                             "temporary directory)")
+    parser.add_argument('--max-size', type=int, default=1024, metavar='N',
+                        help="most compiled regexes kept in memory "
+                             "(default: 1024)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
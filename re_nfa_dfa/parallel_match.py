@@ -0,0 +1,100 @@
+import collections
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .NFA_to_DFA_main import DFA
+
+# DFA of the worker process, mapped from the shared memory block
+_worker_dfa = None
+_worker_memory = None
+
+
+def _init_worker(name):
+    # attaches the worker to the shared memory block holding the DFA
+    # in the binary format, the table is read from it without a copy
+    global _worker_dfa, _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_dfa = DFA.fromBuffer(_worker_memory.buf)
+
+
+def _match_records(method, records):
+    run = getattr(_worker_dfa, method)
+    return [run(record) for record in records]
+
+
+def _match_file_range(method, path, start, end):
+    # matches the lines of path that begin in the byte range [start, end)
+    run = getattr(_worker_dfa, method)
+    results = []
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # a line that began before start belongs to the previous range
+            pos = start
+            if pos > 0 and data[pos - 1] != ord('\n'):
+                pos = data.find(b'\n', pos)
+                pos = len(data) if pos == -1 else pos + 1
+            view = memoryview(data)
+            while pos < end:
+                line_end = data.find(b'\n', pos)
+                if line_end == -1:
+                    line_end = len(data)
+                stop = line_end
+                if stop > pos and data[stop - 1] == ord('\r'):
+                    stop -= 1
+                results.append(run(view[pos:stop]))
+                pos = line_end + 1
+            view.release()
+    return results
+
+
+def _file_ranges(path, size, count):
+    step = max(1, -(-size // count))
+    return [(path, start, min(start + step, size))
+            for start in range(0, size, step)]
+
+
+def _batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
+
+
+def match_many(dfa, source, workers=None, method='fullmatch', batch_size=1024):
+    # matches every record of source against dfa on a pool of worker
+    # processes, yielding the results in the order of the records
+    # source is an iterable of strings, or the path of a file whose lines
+    # are the records; method is the DFA method run on each record
+    # the DFA is put once in shared memory instead of being sent to
+    # every worker, and at most two tasks per worker are in flight
+    workers = workers or os.cpu_count() or 1
+    data = dfa.toBytes()
+    memory = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        memory.buf[:len(data)] = data
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(memory.name,)) as pool:
+            if isinstance(source, (str, os.PathLike)):
+                size = os.path.getsize(source)
+                tasks = (pool.submit(_match_file_range, method, *task)
+                         for task in _file_ranges(source, size, workers * 8))
+            else:
+                tasks = (pool.submit(_match_records, method, batch)
+                         for batch in _batches(source, batch_size))
+
+            pending = collections.deque()
+            for task in tasks:
+                pending.append(task)
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while len(pending) > 0:
+                yield from pending.popleft().result()
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,91 @@
+# Checks the binary format of DFA.save: a DFA read back matches like the
+# one written, and damaged files raise ValueError instead of loading a
+# DFA that reads outside its table
+import struct
+
+import pytest
+
+import re_nfa_dfa
+from re_nfa_dfa import DFA, determinize
+
+PATTERNS = ["(a|b)*abb", "[a-z_][a-z0-9_]*", r"\d{2,4}-\d+", "x?(yz)*",
+            "[Ā-\U0010ffff]+x"]
+TEXTS = ["abb", "aabba", "_x9", "9a", "12-3", "1-2", "", "xyzyz", "yzy",
+         "ā\U0001f600x", "ax"]
+
+
+def compiled(pattern):
+    return re_nfa_dfa.minimize(determinize(re_nfa_dfa.compile(pattern, True)))
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_round_trip(pattern, tmp_path):
+    dfa = compiled(pattern)
+    path = str(tmp_path / "pattern.dfa")
+    dfa.save(path)
+    for loaded in (DFA.fromBuffer(dfa.toBytes()), DFA.load(path)):
+        assert loaded.symbols == dfa.symbols
+        assert list(loaded.table) == list(dfa.table)
+        for text in TEXTS:
+            assert loaded.fullmatch(text) == dfa.fullmatch(text)
+            assert loaded.search(text) == dfa.search(text)
+            assert loaded.fullmatch(text.encode('utf-8')) == \
+                dfa.fullmatch(text.encode('utf-8'))
+
+
+def test_round_trip_keeps_accept_tags():
+    dfa = re_nfa_dfa.minimize(determinize(
+        re_nfa_dfa.compile_set(["ab", "a(b|c)", "x*"], True)))
+    loaded = DFA.fromBuffer(dfa.toBytes())
+    for text in ["ab", "ac", "", "xx", "abx"]:
+        assert loaded.fullmatchAll(text) == dfa.fullmatchAll(text)
+        assert loaded.matchAll(text) == dfa.matchAll(text)
+
+
+def test_truncated_buffers_are_rejected():
+    data = compiled("(a|b)*abb").toBytes()
+    for size in range(len(data)):
+        with pytest.raises(ValueError):
+            DFA.fromBuffer(data[:size])
+
+
+def test_bad_headers_are_rejected():
+    data = compiled("(a|b)*abb").toBytes()
+    magic, version, flags, no_symbol, no_state, start = \
+        DFA.HEADER.unpack_from(data)
+    for header in [(b"XXXX", version, flags, no_symbol, no_state, start),
+                   (magic, version + 1, flags, no_symbol, no_state, start),
+                   (magic, version, flags, no_symbol, 0, start),
+                   (magic, version, flags, no_symbol, no_state, no_state),
+                   (magic, version, flags, no_symbol, no_state + 1, start)]:
+        with pytest.raises(ValueError):
+            DFA.fromBuffer(DFA.HEADER.pack(*header) +
+                           data[DFA.HEADER.size:])
+
+
+def test_bad_transitions_are_rejected():
+    dfa = compiled("(a|b)*abb")
+    data = dfa.toBytes()
+    table = len(data) - len(dfa.table) * 4
+    for value in (-1, dfa.no_state, 2 ** 31 - 1):
+        damaged = bytearray(data)
+        struct.pack_into('<i', damaged, table + 4, value)
+        with pytest.raises(ValueError):
+            DFA.fromBuffer(bytes(damaged))
+
+
+def test_damaged_bytes_never_load_a_broken_dfa():
+    # Any single damaged byte either raises ValueError or gives a DFA whose
+    # transitions all stay in its table
+    data = compiled("(a|b)*abb").toBytes()
+    for i in range(len(data)):
+        for value in (0, 0x7f, 0xff):
+            damaged = bytearray(data)
+            damaged[i] = value
+            try:
+                dfa = DFA.fromBuffer(bytes(damaged))
+            except ValueError:
+                continue
+            for text in TEXTS:
+                dfa.fullmatch(text)
+                dfa.search(text)
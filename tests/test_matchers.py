@@ -0,0 +1,149 @@
+# Checks every matcher against Python's re on randomly generated patterns.
+# A pattern is generated as a tree and written both in the syntax of this
+# package and in the syntax of re, and the leftmost longest answers of the
+# matchers are compared with answers found from re.fullmatch
+import random
+import re
+
+import pytest
+
+import re_nfa_dfa
+from re_nfa_dfa import LazyDFA, StreamMatcher, determinize
+from re_nfa_dfa import Re_to_NFA_main
+
+SYMBOLS = [("a", "a"), ("b", "b"), ("c", "c"), ("[ab]", "[ab]"),
+           ("[b-c]", "[b-c]"), (r"\.", r"\.")]
+ALPHABET = "abc.x"
+
+
+def generate(rng, depth, extended):
+    # returns a random pattern as a (syntax of this package, syntax of re)
+    # pair, every operand is grouped so the two parse the same way
+    k = rng.random()
+    if depth == 0 or k < 0.25:
+        return rng.choice(SYMBOLS)
+    left = generate(rng, depth - 1, extended)
+    if k < 0.5:
+        right = generate(rng, depth - 1, extended)
+        return left[0] + right[0], left[1] + right[1]
+    if k < 0.7:
+        right = generate(rng, depth - 1, extended)
+        union = "|" if extended else "+"
+        return ("(" + left[0] + union + right[0] + ")",
+                "(?:" + left[1] + "|" + right[1] + ")")
+    if k < 0.8:
+        low = rng.randint(0, 2)
+        high = rng.choice([low, low + 1, ""])
+        repeat = "{" + str(low) + "," + str(high) + "}"
+        return "(" + left[0] + ")" + repeat, "(?:" + left[1] + ")" + repeat
+    operator = rng.choice("*?+" if extended else "*?")
+    return "(" + left[0] + ")" + operator, "(?:" + left[1] + ")" + operator
+
+
+def longest_match(pattern, text, pos):
+    # returns the end of the longest match of pattern at pos, -1 if none
+    for end in range(len(text), pos - 1, -1):
+        if pattern.fullmatch(text, pos, end):
+            return end
+    return -1
+
+
+def leftmost_longest(pattern, text, pos):
+    # returns the leftmost longest match of pattern in text[pos:]
+    for start in range(pos, len(text) + 1):
+        end = longest_match(pattern, text, start)
+        if end != -1:
+            return start, end
+    return None
+
+
+def random_text(rng):
+    return "".join(rng.choice(ALPHABET) for i in range(rng.randint(0, 10)))
+
+
+def cases(seed, count, extended):
+    # yields (pattern, re pattern, texts) for count random patterns
+    rng = random.Random(seed)
+    for i in range(count):
+        ours, theirs = generate(rng, 4, extended)
+        yield ours, re.compile(theirs), [random_text(rng) for k in range(8)]
+
+
+@pytest.mark.parametrize("extended", [False, True])
+def test_matchers_agree_with_re(extended):
+    for ours, theirs, texts in cases(1, 150, extended):
+        nfa = re_nfa_dfa.compile(ours, extended)
+        subsets = determinize(nfa)
+        matchers = [subsets, re_nfa_dfa.minimize(subsets), LazyDFA(nfa),
+                    LazyDFA(nfa, max_states=3, thrash_ratio=1),
+                    LazyDFA(nfa, max_states=3, thrash_ratio=0)]
+        for text in texts:
+            pos = len(text) // 3
+            fullmatch = theirs.fullmatch(text) is not None
+            match = longest_match(theirs, text, pos)
+            search = leftmost_longest(theirs, text, pos)
+            for matcher in matchers:
+                assert matcher.fullmatch(text) == fullmatch, (ours, text)
+                assert matcher.match(text, pos) == match, (ours, text)
+                assert matcher.search(text, pos) == search, (ours, text)
+            assert Re_to_NFA_main.fullmatch(ours, text, extended) == \
+                fullmatch, (ours, text)
+            assert Re_to_NFA_main.match(ours, text, pos, extended) == \
+                match, (ours, text)
+
+
+def test_module_functions_agree_with_re():
+    for ours, theirs, texts in cases(2, 60, True):
+        for text in texts:
+            assert re_nfa_dfa.fullmatch(ours, text, True) == \
+                (theirs.fullmatch(text) is not None), (ours, text)
+            assert re_nfa_dfa.match(ours, text, 0, True) == \
+                longest_match(theirs, text, 0), (ours, text)
+            assert re_nfa_dfa.search(ours, text, 0, True) == \
+                leftmost_longest(theirs, text, 0), (ours, text)
+
+
+def test_stream_matcher_agrees_with_re():
+    rng = random.Random(3)
+    for ours, theirs, texts in cases(3, 100, True):
+        dfa = re_nfa_dfa.minimize(determinize(re_nfa_dfa.compile(ours, True)))
+        text = "".join(texts)
+        ends = [end for end in range(1, len(text) + 1)
+                if any(theirs.fullmatch(text, start, end)
+                       for start in range(end + 1))]
+        prefixes = [end for end in range(1, len(text) + 1)
+                    if theirs.fullmatch(text, 0, end)]
+        ending = any(theirs.fullmatch(text, start)
+                     for start in range(len(text) + 1))
+        whole = theirs.fullmatch(text) is not None
+        for anchored, expected, finished in ((False, ends, ending),
+                                             (True, prefixes, whole)):
+            stream = StreamMatcher(dfa, anchored=anchored, max_cache=4)
+            found = []
+            i = 0
+            while i < len(text):
+                size = rng.randint(1, 5)
+                chunk = text[i:i + size]
+                found.extend(stream.feed(chunk if rng.random() < 0.5
+                                         else chunk.encode('latin-1')))
+                i += size
+            assert found == expected, (ours, text, anchored)
+            assert stream.finish() == finished, (ours, text, anchored)
+
+
+def test_compile_set_reports_the_regexes_that_match():
+    rng = random.Random(4)
+    for trial in range(40):
+        pairs = [generate(rng, 3, True) for i in range(rng.randint(1, 4))]
+        patterns = [re.compile(theirs) for ours, theirs in pairs]
+        dfa = re_nfa_dfa.minimize(determinize(
+            re_nfa_dfa.compile_set([ours for ours, theirs in pairs], True)))
+        for k in range(10):
+            text = random_text(rng)
+            full = [i for i, pattern in enumerate(patterns)
+                    if pattern.fullmatch(text)]
+            prefix = [i for i, pattern in enumerate(patterns)
+                      if longest_match(pattern, text, 0) != -1]
+            assert sorted(dfa.fullmatchAll(text)) == full, (pairs, text)
+            assert sorted(dfa.matchAll(text)) == prefix, (pairs, text)
+            assert dfa.fullmatch(text) == (len(full) > 0), (pairs, text)
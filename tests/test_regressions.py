@@ -0,0 +1,156 @@
+# Regressions: patterns and inputs that used to blow up,
+# hang, crash or change the caller's data
+import asyncio
+import copy
+import random
+
+import pytest
+
+import re_nfa_dfa
+from re_nfa_dfa import NFA, LazyDFA, StreamMatcher, determinize
+from re_nfa_dfa import Re_to_NFA_main
+from re_nfa_dfa.match_service import MatchService
+from re_nfa_dfa.NFA_to_DFA_main import RangeClasses, symbolClasses
+
+
+def compiled(pattern, extended=True):
+    return re_nfa_dfa.minimize(determinize(re_nfa_dfa.compile(pattern,
+                                                              extended)))
+
+
+def thompson(pattern):
+    # returns the ε-NFA of Thompson's construction of pattern
+    tree = Re_to_NFA_main.make_exp_tree(Re_to_NFA_main.polish_regex(pattern))
+    return NFA.fromDict(Re_to_NFA_main.nfa_to_dict(
+        Re_to_NFA_main.arrange_nfa(Re_to_NFA_main.compute_regex(tree))))
+
+
+def test_search_does_not_build_the_unanchored_dfa():
+    # The DFA finding a(a|b){20} anywhere has over two million states
+    dfa = compiled("a(a|b){20}")
+    text = "b" * 5000 + "a" * 21 + "b" * 5000
+    assert dfa.search(text) == (5000, 5021)
+    assert dfa.search("ab" * 10) is None
+
+
+def test_stream_does_not_build_the_unanchored_dfa():
+    stream = StreamMatcher(compiled("a(a|b){20}"), max_cache=100)
+    ends = stream.feed("b" * 50 + "ab" * 2000)
+    assert ends == list(range(71, 4050, 2))
+    assert len(stream.cache) <= 100
+
+
+def test_lazy_dfa_search_without_a_literal_prefix():
+    nfa = re_nfa_dfa.compile("(a|b)*(c|d)", True)
+    text = "ab" * 20000
+    for lazy in (LazyDFA(nfa), LazyDFA(nfa, max_states=2, thrash_ratio=1)):
+        assert lazy.search(text) is None
+        assert lazy.search(text + "d") == (0, len(text) + 1)
+
+
+@pytest.mark.parametrize("pattern", ["a)", "(a", "(a+b", "+a", "a++b", "a.+b",
+                                     "", "()", "*a", "a+", "((a)"])
+def test_malformed_regexes_raise_value_error(pattern):
+    with pytest.raises(ValueError):
+        re_nfa_dfa.compile(pattern)
+
+
+@pytest.mark.parametrize("pattern", ["a)", "(a", "a||b", "|a", "a|", "?a"])
+def test_malformed_extended_regexes_raise_value_error(pattern):
+    with pytest.raises(ValueError, match="position|ends with"):
+        re_nfa_dfa.compile(pattern, True)
+
+
+@pytest.mark.parametrize("postfix", ["a+", "ab", "*", "ab+c"])
+def test_malformed_postfix_raises_value_error(postfix):
+    with pytest.raises(ValueError):
+        Re_to_NFA_main.make_exp_tree(postfix)
+
+
+def test_large_classes_are_kept_as_ranges():
+    dfa = compiled("[\x00-\U0010ffff]x")
+    assert isinstance(dfa.classes, RangeClasses)
+    assert len(dfa.classes) <= 2 * 256
+    assert dfa.fullmatch("\U0001f600x")
+    assert dfa.fullmatch("\x00x")
+    assert not dfa.fullmatch("x")
+    assert Re_to_NFA_main.match("[\x00-\U0010ffff]x", "ሴx") == 2
+
+
+def test_range_classes_match_the_listed_ones():
+    # A character in more than one symbol belongs to the last one
+    def escape(c):
+        return "\\" + c if c in "\\]-^[" else c
+
+    rng = random.Random(5)
+    for trial in range(50):
+        symbols = []
+        listed = dict()
+        for i in range(rng.randint(1, 5)):
+            first = rng.randint(0, 0x3000)
+            last = first + rng.choice([0, 5, 300, 6000])
+            symbols.append("[" + escape(chr(first)) + "-" +
+                           escape(chr(last)) + "]")
+            for x in range(first, last + 1):
+                listed[x] = i
+        classes = symbolClasses(symbols)
+        for x in range(0, 0x5000, 3):
+            assert classes.get(chr(x), -1) == listed.get(x, -1)
+            assert classes.get(x, -1) == listed.get(x, -1)
+
+
+def test_nfa_does_not_change_the_lists_it_is_built_from():
+    nfa_json = re_nfa_dfa.compile("(a|b)*abb", True).toDict()
+    before = copy.deepcopy(nfa_json)
+    first = NFA.fromDict(nfa_json)
+    second = NFA.fromDict(nfa_json)
+    assert nfa_json == before
+    assert second.alphabets == first.alphabets
+    for text in ["abb", "aabb", "ab", ""]:
+        assert determinize(first).fullmatch(text) == \
+            determinize(second).fullmatch(text)
+    nfa_json = first.toDict()
+    nfa_json["alphabets"].append("z")
+    nfa_json["finals"].append("q0")
+    assert "z" not in first.alphabets
+    assert len(first.finals) == before["no_final"]
+
+
+def test_remove_epsilon_on_long_patterns():
+    rng = random.Random(1)
+    words = ["".join(rng.choice("abcdefghij") for i in range(6))
+             for k in range(3000)]
+    nfa = thompson("(" + "+".join(words) + ")")
+    reduced = nfa.removeEpsilon()
+    assert reduced is not nfa
+    assert reduced.no_state < nfa.no_state
+    assert LazyDFA(reduced).fullmatch(words[-1])
+    text = "abcdefghij" * 2000
+    nfa = thompson(text)
+    reduced = nfa.removeEpsilon()
+    assert reduced.no_state == len(text) + 1
+    assert LazyDFA(reduced).fullmatch(text)
+
+
+def test_state_lists_of_bitsets():
+    nfa = re_nfa_dfa.compile("ab", True)
+    rng = random.Random(2)
+    for trial in range(200):
+        states = sorted(rng.sample(range(3000), rng.randint(0, 50)))
+        assert nfa.getStateList(nfa.getStateMask(states)) == states
+
+
+def test_service_keeps_at_most_max_size_compiled_regexes():
+    async def compile_all():
+        service = MatchService(1, processes=False, max_size=3)
+        try:
+            for n in range(10):
+                await service.compile("a{" + str(n) + "}")
+            await service.compile("a{8}")
+            assert list(service.compiled) == ["a{7}", "a{9}", "a{8}"]
+            assert await service.run("fullmatch", "a{2}", "aa")
+            assert len(service.compiled) == 3
+        finally:
+            service.close()
+
+    asyncio.run(compile_all())